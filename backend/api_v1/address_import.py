@@ -0,0 +1,177 @@
+import csv
+import json
+import os
+
+from django.db import connection, transaction
+
+from .address_labels import building_label_sql, house_label_sql
+from .models import Building, City, House, Street, bump_data_versions
+
+
+class AddressImportError(Exception):
+    pass
+
+
+FORMATS = {
+    '.csv': 'csv',
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson',
+}
+
+STAGING_TABLE_SQL = '''
+    DROP TABLE IF EXISTS address_import_staging;
+    CREATE TEMPORARY TABLE address_import_staging (
+        city varchar(40) NOT NULL,
+        street varchar(100) NOT NULL,
+        number integer NOT NULL,
+        corpus varchar(5),
+        complex_id bigint
+    ) ON COMMIT DROP;
+'''
+
+COPY_SQL = 'COPY address_import_staging (city, street, number, corpus, complex_id) FROM STDIN'
+
+# Сохранённые адреса строятся по общему формату из address_labels
+UPSERT_SQL = (
+    ('cities', '''
+        INSERT INTO api_v1_city (name)
+        SELECT DISTINCT s.city FROM address_import_staging s
+        ON CONFLICT DO NOTHING
+    '''),
+    ('streets', '''
+        INSERT INTO api_v1_street (city_id, name)
+        SELECT DISTINCT c.id, s.street
+        FROM address_import_staging s
+        JOIN api_v1_city c ON c.name = s.city
+        ON CONFLICT DO NOTHING
+    '''),
+    ('buildings', f'''
+        INSERT INTO api_v1_building (street_id, number, corpus, label)
+        SELECT DISTINCT ON (st.id, s.number, s.corpus)
+            st.id, s.number, s.corpus,
+            {building_label_sql('s.city', 's.street', 's.number', 's.corpus')}
+        FROM address_import_staging s
+        JOIN api_v1_city c ON c.name = s.city
+        JOIN api_v1_street st ON st.city_id = c.id AND st.name = s.street
+        ON CONFLICT DO NOTHING
+    '''),
+    ('houses', f'''
+        INSERT INTO api_v1_house (complex_id, address_id, label)
+        SELECT DISTINCT hc.id, b.id, {house_label_sql('hc.name', 'b.label')}
+        FROM address_import_staging s
+        JOIN api_v1_housingcomplex hc ON hc.id = s.complex_id
+        JOIN api_v1_city c ON c.name = s.city
+        JOIN api_v1_street st ON st.city_id = c.id AND st.name = s.street
+        JOIN api_v1_building b ON b.street_id = st.id AND b.number = s.number
+            AND b.corpus IS NOT DISTINCT FROM s.corpus
+        WHERE NOT EXISTS (
+            SELECT 1 FROM api_v1_house h WHERE h.complex_id = hc.id AND h.address_id = b.id
+        )
+    '''),
+)
+
+
+VERSIONED_TABLES = (
+    ('cities', City),
+    ('streets', Street),
+    ('buildings', Building),
+    ('houses', House),
+)
+
+
+def guess_format(filename):
+    file_format = FORMATS.get(os.path.splitext(filename)[1].lower())
+    if file_format is None:
+        raise AddressImportError(f'Неизвестный формат файла {filename}. Поддерживаются CSV и NDJSON')
+    return file_format
+
+
+def read_rows(stream, file_format):
+    """
+    Построчное чтение реестра. Для некорректных строк NDJSON возвращается None
+    """
+
+    if file_format == 'csv':
+        yield from csv.DictReader(stream)
+    elif file_format == 'ndjson':
+        for line in stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield None
+                continue
+            yield row if isinstance(row, dict) else None
+    else:
+        raise AddressImportError(f'Неизвестный формат {file_format}. Поддерживаются csv и ndjson')
+
+
+def normalize_row(row):
+    """
+    Приведение строки реестра к кортежу (город, улица, номер, корпус, id ЖК).
+    Для строк, которые нельзя загрузить, возвращается None
+    """
+
+    if row is None:
+        return None
+
+    city = str(row.get('city') or '').strip()
+    street = str(row.get('street') or '').strip()
+    corpus = str(row.get('corpus') or '').strip() or None
+    complex_id = row.get('complex')
+
+    try:
+        number = int(row.get('number'))
+        complex_id = int(complex_id) if complex_id not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+    if not city or not street or len(city) > 40 or len(street) > 100 or (corpus and len(corpus) > 5):
+        return None
+
+    return city, street, number, corpus, complex_id
+
+
+def import_addresses(stream, file_format, progress=None, progress_every=50000):
+    """
+    Загрузка реестра адресов (CSV или NDJSON с полями city, street, number, corpus, complex)
+    в города, улицы, строения и жилые дома.
+    Строки потоково копируются (COPY) во временную таблицу, после чего недостающие записи
+    добавляются несколькими запросами INSERT ... SELECT. Уже существующие записи не изменяются.
+    Поле complex (id жилого комплекса) необязательно, без него жилой дом не создаётся
+    """
+
+    if connection.vendor != 'postgresql':
+        raise AddressImportError('Импорт реестра адресов поддерживается только для PostgreSQL')
+
+    result = {'rows': 0, 'skipped': 0, 'cities': 0, 'streets': 0, 'buildings': 0, 'houses': 0}
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(STAGING_TABLE_SQL)
+
+        with cursor.copy(COPY_SQL) as copy:
+            for row in read_rows(stream, file_format):
+                values = normalize_row(row)
+                if values is None:
+                    result['skipped'] += 1
+                    continue
+
+                copy.write_row(values)
+                result['rows'] += 1
+                if progress and result['rows'] % progress_every == 0:
+                    progress(result['rows'])
+
+        cursor.execute('ANALYZE address_import_staging')
+
+        for key, sql in UPSERT_SQL:
+            cursor.execute(sql)
+            result[key] = cursor.rowcount
+
+        # Записи добавляются без сигналов моделей, поэтому версии справочников обновляются явно
+        changed = [model for key, model in VERSIONED_TABLES if result[key]]
+        if changed:
+            bump_data_versions(*changed)
+
+    return result
@@ -0,0 +1,71 @@
+"""
+Формат сохранённых адресов строений и жилых домов (Building.label, House.label).
+Используется моделями, миграциями и импортом реестра адресов, поэтому не зависит от моделей
+"""
+
+
+def building_label(city, street, number, corpus):
+    corp = f'/{corpus}' if corpus else ''
+    return f'г. {city}, ул. {street}, д. {number}{corp}'
+
+
+def house_label(complex_name, address_label):
+    return f'{complex_name}: {address_label}'
+
+
+def building_label_sql(city, street, number, corpus):
+    """
+    SQL-выражение адреса строения (аргументы - SQL-выражения названия города, улицы, номера и корпуса)
+    """
+
+    return (f"'г. ' || {city} || ', ул. ' || {street} || ', д. ' || {number}"
+            f" || COALESCE('/' || NULLIF({corpus}, ''), '')")
+
+
+def house_label_sql(complex_name, address_label):
+    return f"{complex_name} || ': ' || {address_label}"
+
+
+BUILDING_LABEL_SQL = building_label_sql('c.name', 's.name', 'b.number', 'b.corpus')
+
+HOUSE_LABEL_SQL = house_label_sql('hc.name', 'b.label')
+
+# Условие condition записывается через псевдонимы b (строение), s (улица), c (город).
+# Строки с неизменившимся адресом не перезаписываются
+REFRESH_BUILDING_LABELS_SQL = f'''
+    UPDATE api_v1_building b
+    SET label = {BUILDING_LABEL_SQL}
+    FROM api_v1_street s
+    JOIN api_v1_city c ON c.id = s.city_id
+    WHERE s.id = b.street_id
+        AND b.label IS DISTINCT FROM {BUILDING_LABEL_SQL}
+        AND {{condition}}
+'''
+
+# Условие condition записывается через псевдонимы h (жилой дом), hc (жилой комплекс), b (строение)
+REFRESH_HOUSE_LABELS_SQL = f'''
+    UPDATE api_v1_house h
+    SET label = {HOUSE_LABEL_SQL}
+    FROM api_v1_housingcomplex hc, api_v1_building b
+    WHERE hc.id = h.complex_id AND b.id = h.address_id
+        AND h.label IS DISTINCT FROM {HOUSE_LABEL_SQL}
+        AND {{condition}}
+'''
+
+
+def refresh_building_labels(cursor, condition, params=None):
+    """
+    Пересчёт сохранённых адресов строений одним запросом. Возвращает количество изменённых строк
+    """
+
+    cursor.execute(REFRESH_BUILDING_LABELS_SQL.format(condition=condition), params)
+    return cursor.rowcount
+
+
+def refresh_house_labels(cursor, condition, params=None):
+    """
+    Пересчёт сохранённых адресов жилых домов одним запросом. Возвращает количество изменённых строк
+    """
+
+    cursor.execute(REFRESH_HOUSE_LABELS_SQL.format(condition=condition), params)
+    return cursor.rowcount
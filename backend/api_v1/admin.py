@@ -1,9 +1,38 @@
 from django.contrib import admin
+from django.contrib.postgres.search import SearchQuery
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
 from .models import *
 from django.urls import reverse
 from django.utils.safestring import mark_safe
 
 
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор для больших таблиц: для списка без фильтров и поиска количество записей
+    берётся из статистики PostgreSQL (pg_class.reltuples) вместо COUNT(*) по всей таблице
+    """
+
+    estimate_threshold = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if not queryset.query.where and connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+                    [queryset.model._meta.db_table]
+                )
+                row = cursor.fetchone()
+            if row and row[0] >= self.estimate_threshold:
+                return int(row[0])
+        return super().count
+
+
 @admin.register(City)
 class CityAdmin(admin.ModelAdmin):
     fields = ['name']
@@ -23,7 +52,9 @@ class CityAdmin(admin.ModelAdmin):
 @admin.register(Street)
 class StreetAdmin(admin.ModelAdmin):
     fields = ['name', 'city']
+    autocomplete_fields = ['city']
     list_display = ('name', 'city',)
+    list_select_related = ('city',)
     list_display_links = ('name', 'city',)
     ordering = ['name', 'city']
     list_per_page = 10
@@ -33,6 +64,9 @@ class StreetAdmin(admin.ModelAdmin):
     ]
     save_on_top = True
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('city')
+
     class Meta:
         model = Street
 
@@ -40,15 +74,19 @@ class StreetAdmin(admin.ModelAdmin):
 @admin.register(Building)
 class BuildingAdmin(admin.ModelAdmin):
     fields = ['street', 'number', 'corpus']
+    autocomplete_fields = ['street']
     search_fields = [
-        'street__name',
-        'street__city__name',
-        'number'
+        'label',
     ]
-    ordering = ['street', 'number']
+    ordering = ['label']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     list_per_page = 10
     save_on_top = True
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('street__city')
+
     class Meta:
         model = Building
 
@@ -89,6 +127,10 @@ class WorkScheduleAdmin(admin.ModelAdmin):
 
 @admin.register(Office)
 class OfficeAdmin(admin.ModelAdmin):
+    autocomplete_fields = ['address']
+    list_display = ('name', 'address', 'work_schedule')
+    list_select_related = ('address__street__city', 'work_schedule')
+    ordering = ['name']
     save_on_top = True
     search_fields = [
         'name',
@@ -97,14 +139,18 @@ class OfficeAdmin(admin.ModelAdmin):
         'address__number'
     ]
     readonly_fields = ['display_related_employees']
+    related_limit = 100
 
     def display_related_employees(self, obj):
-        employees = Employee.objects.filter(office=obj)
+        employees = obj.employee_set.select_related('position', 'office').order_by('surname', 'name')
         employee_links = [
             (f'<a href="{reverse("admin:api_v1_employee_change", args=(employee.id,))}">'
              f'{employee.position.name}: {employee}</a>')
-            for employee in employees
+            for employee in employees[:self.related_limit]
         ]
+        if len(employee_links) == self.related_limit:
+            url = f'{reverse("admin:api_v1_employee_changelist")}?office__id__exact={obj.id}'
+            employee_links.append(f'<a href="{url}">Все сотрудники ({employees.count()})</a>')
         return mark_safe('<br>'.join(employee_links))
 
     display_related_employees.short_description = "Сотрудники"
@@ -115,23 +161,29 @@ class OfficeAdmin(admin.ModelAdmin):
 
 @admin.register(HousingComplex)
 class HousingComplexAdmin(admin.ModelAdmin):
+    list_display = ('name', 'office')
+    list_select_related = ('office',)
+    list_filter = ('office',)
+    ordering = ['name']
     save_on_top = True
     search_fields = [
         'name',
         'office__name',
-        'street__name',
-        'street__city__name'
     ]
     readonly_fields = ['display_related_houses']
+    related_limit = 100
 
     def display_related_houses(self, obj):
-        houses = House.objects.filter(complex=obj)
-        employee_links = [
+        houses = obj.house_set.order_by('label')
+        house_links = [
             (f'<a href="{reverse("admin:api_v1_house_change", args=(house.id,))}">'
-             f'{house.address.__str__()}</a>')
-            for house in houses
+             f'{house.label}</a>')
+            for house in houses[:self.related_limit]
         ]
-        return mark_safe('<br>'.join(employee_links))
+        if len(house_links) == self.related_limit:
+            url = f'{reverse("admin:api_v1_house_changelist")}?complex__id__exact={obj.id}'
+            house_links.append(f'<a href="{url}">Все дома ({houses.count()})</a>')
+        return mark_safe('<br>'.join(house_links))
 
     display_related_houses.short_description = "Дома"
 
@@ -141,15 +193,19 @@ class HousingComplexAdmin(admin.ModelAdmin):
 
 @admin.register(House)
 class HouseAdmin(admin.ModelAdmin):
+    autocomplete_fields = ['complex', 'address']
+    list_display = ('label', 'complex')
+    list_select_related = ('complex',)
+    list_filter = ('complex',)
+    ordering = ['label']
     save_on_top = True
     search_fields = [
-        'complex__name',
-        'address__street__city__name',
-        'address__street__name',
-        'address__number',
-        'address__corpus',
+        'label',
     ]
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('complex', 'address__street__city')
+
     class Meta:
         model = House
 
@@ -158,13 +214,16 @@ class HouseAdmin(admin.ModelAdmin):
 class ResidentAdmin(admin.ModelAdmin):
     save_on_top = True
     fields = ['surname', 'name', 'patronymic', 'phone', 'tg_id']
+    ordering = ['-id']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     search_fields = [
-        'name',
         'surname',
-        'patronymic',
-        'phone',
-        'tg_id',
     ]
+    search_help_text = 'Поиск по фамилии (и началу имени или отчества), номеру телефона или tgID'
+
+    def get_search_results(self, request, queryset, search_term):
+        return queryset.search(search_term), False
 
     class Meta:
         model = Resident
@@ -201,6 +260,7 @@ class PositionAdmin(admin.ModelAdmin):
 @admin.register(Employee)
 class EmployeeAdmin(admin.ModelAdmin):
     fields = ['surname', 'name', 'patronymic', 'phone', 'email', 'office', 'position', 'tg_id']
+    ordering = ['surname', 'name']
     list_per_page = 10
     search_fields = [
         'name',
@@ -219,46 +279,66 @@ class EmployeeAdmin(admin.ModelAdmin):
     ]
     save_on_top = True
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('office')
+
     class Meta:
         model = Employee
 
 
 @admin.register(Request)
 class RequestAdmin(admin.ModelAdmin):
-    readonly_fields = ['created_at', 'display_photo']
+    readonly_fields = ['created_at', 'display_photo', 'photo_file_id']
+    autocomplete_fields = ['resident', 'address']
+    list_display = ('id', 'created_at', 'status', 'display_address', 'apartment', 'resident')
+    list_display_links = ('id', 'created_at')
+    list_select_related = ('status', 'address', 'resident')
+    list_filter = (
+        ('created_at', admin.DateFieldListFilter),
+        'status',
+        'address__complex__office',
+        'address__complex',
+    )
+    ordering = ['-created_at', '-id']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     list_per_page = 10
-    search_fields = [
-        'text',
-        'status__name',
-        'resident__name',
-        'resident__surname',
-        'resident__patronymic',
-        'resident__phone',
-        'resident__tg_id',
-        'address__complex__name',
-        'address__address__street__city__name',
-        'address__address__street__name',
-        'address__address__number',
-        'address__address__corpus',
-        'apartment',
-        'employee__name',
-        'employee__surname',
-        'employee__patronymic',
-        'employee__phone',
-        'employee__email',
-        'employee__office__name',
-        'employee__office__address__street__city__name',
-        'employee__office__address__street__name',
-        'employee__office__address__number',
-        'employee__office__address__corpus',
-        'employee__position__name',
-        'employee__position__department__name',
-        'employee__tg_id',
-        'service__name'
-    ]
+    search_fields = ['text']
+    search_help_text = 'Поиск по тексту обращения, номеру заявки, телефону или tgID жителя'
     save_on_top = True
 
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Числа ищутся в номере заявки, телефоне и tgID жителя, остальное - полнотекстовым поиском
+        по тексту обращения (индекс request_search_vector_idx)
+        """
+
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+
+        digits = search_term.lstrip('+')
+        if digits.isdigit():
+            residents = Q(phone__contains=digits)
+            condition = Q()
+            if int(digits) < 2 ** 31:
+                condition |= Q(pk=int(digits))
+            if int(digits) < 2 ** 63:
+                residents |= Q(tg_id=int(digits))
+            resident_ids = list(Resident.objects.filter(residents).values_list('pk', flat=True)[:1000])
+            return queryset.filter(condition | Q(resident_id__in=resident_ids)), False
+
+        query = SearchQuery(search_term, config='russian', search_type='websearch')
+        return queryset.filter(search_vector=query), False
+
+    def display_address(self, obj):
+        return obj.address.label
+
+    display_address.short_description = 'Адрес заявки'
+
     def display_photo(self, obj):
+        if not obj.photo:
+            return '-'
         return mark_safe(f'<img src={obj.photo.url} width="50" height="60">')
 
     display_photo.short_description = 'Фото обращения'
@@ -284,9 +364,34 @@ class ServiceAdmin(admin.ModelAdmin):
 
 @admin.register(RequestTask)
 class RequestTaskAdmin(admin.ModelAdmin):
+    raw_id_fields = ['request']
+    autocomplete_fields = ['employee', 'service']
+    list_display = ('id', 'display_request', 'service', 'employee', 'status')
+    list_select_related = ('service', 'employee__office', 'status')
+    list_filter = ('status', 'employee__office', 'service')
+    ordering = ['-id']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     list_per_page = 10
+    search_fields = ['employee__surname']
+    search_help_text = 'Поиск по номеру заявки или фамилии исполнителя'
     save_on_top = True
 
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        if search_term.isdigit() and int(search_term) < 2 ** 31:
+            return queryset.filter(request_id=int(search_term)), False
+        return queryset.filter(
+            employee__in=Employee.objects.filter(surname__istartswith=search_term).values('pk')
+        ), False
+
+    def display_request(self, obj):
+        return f'Заявка №{obj.request_id}'
+
+    display_request.short_description = 'Заявка'
+
     class Meta:
         model = RequestTask
 
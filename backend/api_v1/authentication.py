@@ -0,0 +1,110 @@
+import pickle
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+
+# Время жизни записи в общем кэше (settings.CACHES) и в памяти процесса, секунды
+AUTH_TOKEN_CACHE_TIMEOUT = getattr(settings, 'AUTH_TOKEN_CACHE_TIMEOUT', 60)
+AUTH_TOKEN_LOCAL_CACHE_TIMEOUT = getattr(settings, 'AUTH_TOKEN_LOCAL_CACHE_TIMEOUT', 5)
+AUTH_TOKEN_LOCAL_CACHE_SIZE = 1000
+AUTH_TOKEN_CACHE_ALIAS = 'default'
+
+
+def get_shared_cache():
+    """
+    Кэш Django для токенов, если он общий для всех процессов (Redis при заданном REDIS_URL).
+    Кэш в памяти процесса не подходит: удаление записи при выходе из системы не дошло бы
+    до остальных процессов gunicorn, поэтому в этом случае возвращается None и токены не кэшируются
+    """
+
+    cache = caches[AUTH_TOKEN_CACHE_ALIAS]
+    if isinstance(cache, (LocMemCache, DummyCache)):
+        return None
+    return cache
+
+
+class TokenCache:
+    """
+    Двухуровневый кэш токенов API: словарь в памяти процесса с коротким временем жизни
+    перед общим кэшем Django. Работает только с общим для процессов кэшем (см. get_shared_cache),
+    без него каждый запрос проверяет токен в БД.
+    Записи удаляются сигналами при выходе из системы и изменении пользователя (см. models.py):
+    из общего кэша - сразу для всех процессов, из памяти - в текущем процессе.
+    В остальных процессах запись живёт не дольше AUTH_TOKEN_LOCAL_CACHE_TIMEOUT
+    """
+
+    def __init__(self):
+        self.local = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def cache_key(key):
+        return f'auth_token:{key}'
+
+    def get(self, key):
+        shared_cache = get_shared_cache()
+        if shared_cache is None:
+            return None
+
+        now = time.monotonic()
+        with self.lock:
+            entry = self.local.get(key)
+        if entry and entry[1] > now:
+            # В памяти хранится сериализованная копия, чтобы запросы не делили один объект пользователя
+            return pickle.loads(entry[0])
+
+        token = shared_cache.get(self.cache_key(key))
+        if token is not None:
+            self.set_local(key, token)
+        return token
+
+    def set(self, key, token):
+        shared_cache = get_shared_cache()
+        if shared_cache is None:
+            return
+        shared_cache.set(self.cache_key(key), token, AUTH_TOKEN_CACHE_TIMEOUT)
+        self.set_local(key, token)
+
+    def set_local(self, key, token):
+        with self.lock:
+            if len(self.local) >= AUTH_TOKEN_LOCAL_CACHE_SIZE:
+                self.local.clear()
+            self.local[key] = (pickle.dumps(token), time.monotonic() + AUTH_TOKEN_LOCAL_CACHE_TIMEOUT)
+
+    def delete(self, *keys):
+        shared_cache = get_shared_cache()
+        if shared_cache is not None:
+            shared_cache.delete_many([self.cache_key(key) for key in keys])
+        with self.lock:
+            for key in keys:
+                self.local.pop(key, None)
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Аутентификация по токену с кэшированием соответствия токен -> пользователь.
+    При попадании в кэш запрос к таблицам токенов и пользователей не выполняется
+    """
+
+    def authenticate_credentials(self, key):
+        token = token_cache.get(key)
+        if token is None:
+            user, token = super().authenticate_credentials(key)
+            token_cache.set(key, token)
+        return token.user, token
+
+
+def invalidate_user_tokens(user):
+    keys = list(Token.objects.filter(user=user).values_list('key', flat=True))
+    if keys:
+        token_cache.delete(*keys)
@@ -0,0 +1,47 @@
+from django.db.models import F
+
+from .models import Building, House, HousingComplex, Street, get_data_versions
+
+
+# Модели, от которых зависит содержимое справочника адресов для ботов
+CATALOG_MODELS = (HousingComplex, House, Building, Street)
+
+
+def get_catalog_version():
+    """
+    Версия справочника - сумма счётчиков DataVersion его моделей.
+    Счётчики только растут, поэтому версия меняется при любом изменении справочника
+    """
+
+    versions, updated_at = get_data_versions(*CATALOG_MODELS)
+    return sum(version for name, version in versions)
+
+
+def short_house_name(street, number, corpus):
+    # Совпадает с House.short_str()
+    if corpus:
+        return f'ул. {street}, д. {number}/{corpus}'
+    return f'ул. {street}, д. {number}'
+
+
+def build_catalog():
+    """
+    Все жилые комплексы с их домами. Дома передаются компактно - парами [pk, короткий адрес]
+    """
+
+    complexes = {
+        pk: {'pk': pk, 'name': name, 'houses': []}
+        for pk, name in HousingComplex.objects.order_by('name', 'pk').values_list('pk', 'name')
+    }
+
+    houses = House.objects.order_by(
+        'complex_id', 'address__street__name', 'address__number', F('address__corpus').asc(nulls_first=True), 'pk'
+    ).values_list('pk', 'complex_id', 'address__street__name', 'address__number', 'address__corpus')
+    for pk, complex_id, street, number, corpus in houses.iterator(chunk_size=5000):
+        # ЖК, добавленный между запросами, пропускается: версия справочника (прочитанная до него)
+        # уже изменилась, и боты загрузят справочник повторно
+        housing_complex = complexes.get(complex_id)
+        if housing_complex is not None:
+            housing_complex['houses'].append([pk, short_house_name(street, number, corpus)])
+
+    return list(complexes.values())
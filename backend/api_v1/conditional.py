@@ -0,0 +1,43 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers, quote_etag
+from django.utils.http import http_date
+
+from .models import get_data_versions
+
+
+class DataVersionConditionalMixin:
+    """
+    Условные GET-запросы к справочникам. ETag и Last-Modified строятся по счётчикам версий
+    моделей из etag_models (см. DataVersion), поэтому при совпадении If-None-Match
+    ответ 304 отдаётся без обращения к таблицам справочника.
+    Проверка выполняется после аутентификации и проверки прав доступа
+    """
+
+    etag_models = ()
+
+    def get_etag(self, request, versions):
+        key = '|'.join([
+            request.get_full_path(),
+            request.accepted_renderer.format,
+            *(f'{name}:{version}' for name, version in versions),
+        ])
+        return quote_etag(hashlib.sha1(key.encode()).hexdigest())
+
+    def get(self, request, *args, **kwargs):
+        versions, updated_at = get_data_versions(*self.etag_models)
+        etag = self.get_etag(request, versions)
+        last_modified = int(updated_at.timestamp()) if updated_at else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified:
+                response['Last-Modified'] = http_date(last_modified)
+        # Ответ может храниться только в кэше клиента и перед использованием всегда перепроверяется
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ('Accept', 'Authorization'))
+        return response
@@ -0,0 +1,49 @@
+import datetime
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api_v1.request_export import FORMATS, get_export_queryset, iter_export
+
+
+def parse_date(value):
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f'Неверная дата {value}, ожидается формат ГГГГ-ММ-ДД')
+
+
+class Command(BaseCommand):
+    help = 'Потоковая выгрузка заявок с задачами в CSV или NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', '-o', default='-', help='Путь к файлу выгрузки или "-" для стандартного вывода')
+        parser.add_argument('--format', choices=FORMATS, default='csv', help='Формат выгрузки')
+        parser.add_argument('--date-from', type=parse_date, help='Начало периода (ГГГГ-ММ-ДД, включительно)')
+        parser.add_argument('--date-to', type=parse_date, help='Конец периода (ГГГГ-ММ-ДД, включительно)')
+        parser.add_argument('--office', type=int, help='ID офиса УК')
+        parser.add_argument('--status', type=int, action='append', help='ID статуса заявки (можно указать несколько раз)')
+        parser.add_argument('--gzip', action='store_true', help='Сжать выгрузку gzip')
+
+    def handle(self, *args, **options):
+        queryset = get_export_queryset(
+            date_from=options['date_from'],
+            date_to=options['date_to'],
+            office=options['office'],
+            statuses=options['status'],
+        )
+        chunks = iter_export(queryset, options['format'], compress=options['gzip'])
+
+        if options['output'] == '-':
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+            return
+
+        try:
+            with open(options['output'], 'wb') as output:
+                for chunk in chunks:
+                    output.write(chunk)
+        except OSError as e:
+            raise CommandError(e)
+        self.stderr.write(self.style.SUCCESS(f"Выгрузка сохранена в {options['output']}"))
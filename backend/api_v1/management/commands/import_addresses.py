@@ -0,0 +1,41 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api_v1.address_import import AddressImportError, guess_format, import_addresses
+
+
+class Command(BaseCommand):
+    help = ('Импорт реестра адресов из CSV или NDJSON (поля city, street, number, corpus, complex). '
+            'Для чтения из стандартного ввода укажите "-" и параметр --format')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу реестра или "-" для стандартного ввода')
+        parser.add_argument('--format', choices=['csv', 'ndjson'], help='Формат файла (по умолчанию по расширению)')
+        parser.add_argument('--progress-every', type=int, default=50000,
+                            help='Выводить прогресс каждые N загруженных строк')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        started = time.monotonic()
+
+        def report(rows):
+            self.stdout.write(f'Загружено строк: {rows} ({time.monotonic() - started:.1f} с)')
+
+        try:
+            file_format = options['format'] or guess_format(path)
+            if path == '-':
+                result = import_addresses(sys.stdin, file_format, report, options['progress_every'])
+            else:
+                with open(path, encoding='utf-8-sig', newline='') as stream:
+                    result = import_addresses(stream, file_format, report, options['progress_every'])
+        except (AddressImportError, OSError) as e:
+            raise CommandError(e)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Импорт завершён за {time.monotonic() - started:.1f} с. "
+            f"Строк: {result['rows']}, пропущено: {result['skipped']}. "
+            f"Добавлено городов: {result['cities']}, улиц: {result['streets']}, "
+            f"адресов: {result['buildings']}, жилых домов: {result['houses']}"
+        ))
@@ -0,0 +1,34 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.authtoken.models import Token
+
+
+class Command(BaseCommand):
+    help = ('Выпуск постоянного токена API для сервисной учётной записи бота. '
+            'Токен передаётся боту в переменной окружения (RES_API_TOKEN или EMPL_API_TOKEN), '
+            'после чего бот не входит в систему по паролю при обращениях к API')
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='Имя сервисной учётной записи (например, residentBot или staffBot)')
+        parser.add_argument('--rotate', action='store_true', help='Отозвать текущий токен и выпустить новый')
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        user, created = User.objects.get_or_create(username=options['username'])
+        if created:
+            # Сервисная учётная запись работает только по токену, вход по паролю для неё невозможен
+            user.set_unusable_password()
+        if created or not user.is_staff:
+            user.is_staff = True
+            user.save()
+
+        if options['rotate']:
+            Token.objects.filter(user=user).delete()
+        token, token_created = Token.objects.get_or_create(user=user)
+
+        if created:
+            self.stderr.write(f'Создана сервисная учётная запись {user.username}')
+        if options['rotate'] or token_created:
+            self.stderr.write(f'Выпущен новый токен для {user.username}')
+        self.stdout.write(token.key)
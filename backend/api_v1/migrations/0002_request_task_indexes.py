@@ -0,0 +1,29 @@
+# Generated by Django 4.2.8 on 2026-10-18 10:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_v1', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='request_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(condition=models.Q(('status__in', [2, 3])), fields=['created_at', 'id'], name='request_active_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['resident', 'created_at', 'id'], name='request_resident_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='requesttask',
+            index=models.Index(condition=models.Q(('status__in', [1, 2, 3])), fields=['employee', 'id'], name='task_open_employee_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.8 on 2026-10-18 10:07
+
+from django.db import migrations, models
+
+from api_v1.address_labels import refresh_building_labels, refresh_house_labels
+
+
+def fill_address_labels(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        refresh_building_labels(cursor, 'TRUE')
+        refresh_house_labels(cursor, 'TRUE')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_v1', '0002_request_task_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='building',
+            name='label',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=255, verbose_name='Полный адрес'),
+        ),
+        migrations.AddField(
+            model_name='house',
+            name='label',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=255, verbose_name='Полный адрес'),
+        ),
+        migrations.RunPython(fill_address_labels, migrations.RunPython.noop),
+    ]
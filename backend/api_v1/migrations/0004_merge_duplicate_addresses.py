@@ -0,0 +1,46 @@
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def merge_duplicate_addresses(apps, schema_editor):
+    """
+    Подготовка к ограничениям уникальности адресов: пустой корпус приводится к NULL,
+    повторяющиеся улицы и строения объединяются с сохранением ссылок на них
+    """
+
+    Street = apps.get_model('api_v1', 'Street')
+    Building = apps.get_model('api_v1', 'Building')
+    House = apps.get_model('api_v1', 'House')
+    Office = apps.get_model('api_v1', 'Office')
+
+    Building.objects.filter(corpus='').update(corpus=None)
+
+    duplicate_streets = Street.objects.values('city', 'name').annotate(
+        keep_id=Min('id'), count=Count('id')
+    ).filter(count__gt=1)
+    for street in duplicate_streets:
+        duplicates = Street.objects.filter(city=street['city'], name=street['name']).exclude(id=street['keep_id'])
+        Building.objects.filter(street__in=duplicates).update(street=street['keep_id'])
+        duplicates.delete()
+
+    duplicate_buildings = Building.objects.values('street', 'number', 'corpus').annotate(
+        keep_id=Min('id'), count=Count('id')
+    ).filter(count__gt=1)
+    for building in duplicate_buildings:
+        duplicates = Building.objects.filter(
+            street=building['street'], number=building['number'], corpus=building['corpus']
+        ).exclude(id=building['keep_id'])
+        House.objects.filter(address__in=duplicates).update(address=building['keep_id'])
+        Office.objects.filter(address__in=duplicates).update(address=building['keep_id'])
+        duplicates.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_v1', '0003_address_labels'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_addresses, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.8 on 2026-10-18 10:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_v1', '0004_merge_duplicate_addresses'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='building',
+            constraint=models.UniqueConstraint(fields=('street', 'number', 'corpus'), name='building_unique_address'),
+        ),
+        migrations.AddConstraint(
+            model_name='building',
+            constraint=models.UniqueConstraint(condition=models.Q(('corpus__isnull', True)), fields=('street', 'number'), name='building_unique_address_without_corpus'),
+        ),
+        migrations.AddConstraint(
+            model_name='street',
+            constraint=models.UniqueConstraint(fields=('city', 'name'), name='street_unique_name_in_city'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.8 on 2026-10-18 10:16
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_v1', '0005_address_unique_constraints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='request',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый вектор текста'),
+        ),
+        migrations.RunSQL(
+            sql=[
+                '''
+                CREATE TRIGGER request_search_vector_update
+                BEFORE INSERT OR UPDATE OF text ON api_v1_request
+                FOR EACH ROW EXECUTE FUNCTION
+                tsvector_update_trigger(search_vector, 'pg_catalog.russian', text)
+                ''',
+                "UPDATE api_v1_request SET search_vector = to_tsvector('pg_catalog.russian', text)",
+            ],
+            reverse_sql='DROP TRIGGER IF EXISTS request_search_vector_update ON api_v1_request',
+        ),
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['created_at', 'id'], name='request_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='request',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='request_search_vector_idx'),
+        ),
+    ]
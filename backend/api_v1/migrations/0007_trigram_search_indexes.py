@@ -0,0 +1,29 @@
+# Generated by Django 4.2.8 on 2026-10-18 10:21
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_v1', '0006_request_search_vector'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='house',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('label'), name='gin_trgm_ops'), name='house_label_trgm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resident',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('surname'), name='gin_trgm_ops'), name='resident_surname_trgm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resident',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass('phone', name='gin_trgm_ops'), name='resident_phone_trgm_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.8 on 2026-10-18 10:30
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_v1', '0007_trigram_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='building',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('label'), name='gin_trgm_ops'), name='building_label_trgm_idx'),
+        ),
+    ]
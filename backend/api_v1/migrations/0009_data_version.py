@@ -0,0 +1,26 @@
+# Generated by Django 4.2.8 on 2026-10-18 10:33
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_v1', '0008_building_label_trgm_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataVersion',
+            fields=[
+                ('name', models.CharField(max_length=100, primary_key=True, serialize=False, verbose_name='Модель')),
+                ('version', models.BigIntegerField(default=0, verbose_name='Версия')),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Дата и время изменения')),
+            ],
+            options={
+                'verbose_name': 'Версия справочника',
+                'verbose_name_plural': 'Версии справочников',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.8 on 2026-10-18 10:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_v1', '0009_data_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='request',
+            name='photo_file_id',
+            field=models.CharField(blank=True, default='', max_length=255, verbose_name='file_id фото в Telegram'),
+        ),
+    ]
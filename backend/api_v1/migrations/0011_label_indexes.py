@@ -0,0 +1,31 @@
+# Generated by Django 4.2.8 on 2026-10-18 11:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_v1', '0010_request_photo_file_id'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='building',
+            name='label',
+            field=models.CharField(default='', editable=False, max_length=255, verbose_name='Полный адрес'),
+        ),
+        migrations.AlterField(
+            model_name='house',
+            name='label',
+            field=models.CharField(default='', editable=False, max_length=255, verbose_name='Полный адрес'),
+        ),
+        migrations.AddIndex(
+            model_name='building',
+            index=models.Index(fields=['label'], name='building_label_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='house',
+            index=models.Index(fields=['label'], name='house_label_idx'),
+        ),
+    ]
@@ -1,11 +1,19 @@
-from django.db import models
+from django.db import connection, models
+from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
+from django.db.models.functions import Upper
 from django.db.models.signals import pre_save
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from datetime import timedelta
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .address_labels import building_label, house_label, refresh_building_labels, refresh_house_labels
+from .authentication import invalidate_user_tokens, token_cache
 
 
 class City(models.Model):
@@ -46,6 +54,9 @@ class Street(models.Model):
     class Meta:
         verbose_name = 'Улица'
         verbose_name_plural = 'Улицы'
+        constraints = [
+            models.UniqueConstraint(fields=['city', 'name'], name='street_unique_name_in_city'),
+        ]
 
 
 class Building(models.Model):
@@ -56,6 +67,7 @@ class Building(models.Model):
     street = models.ForeignKey(Street, on_delete=models.CASCADE, null=False, verbose_name='Улица')
     number = models.IntegerField(null=False, verbose_name='Номер здания')
     corpus = models.CharField(max_length=5, null=True, blank=True, verbose_name='Корпус')
+    label = models.CharField(max_length=255, default='', editable=False, verbose_name='Полный адрес')
 
     def __str__(self):
         corp = ''
@@ -70,21 +82,59 @@ class Building(models.Model):
         return f'{self.street.short_str()}, д. {self.number}{corp}'
 
     def short_str_with_city(self):
-        corp = ''
-        if self.corpus:
-            corp = f'/{self.corpus}'
-        return f'{self.street.short_str_with_city()}, д. {self.number}{corp}'
+        return building_label(self.street.city.name, self.street.name, self.number, self.corpus)
 
     class Meta:
         verbose_name = 'Адрес'
         verbose_name_plural = 'Адреса'
+        constraints = [
+            models.UniqueConstraint(fields=['street', 'number', 'corpus'], name='building_unique_address'),
+            # NULL в корпусе не участвует в проверке уникальности, поэтому дома без корпуса проверяются отдельно
+            models.UniqueConstraint(
+                fields=['street', 'number'],
+                condition=models.Q(corpus__isnull=True),
+                name='building_unique_address_without_corpus'
+            ),
+        ]
+        indexes = [
+            # Сортировка по адресу (список адресов, админка)
+            models.Index(fields=['label'], name='building_label_idx'),
+            # Поиск адреса по подстроке (label__icontains), в том числе в админке
+            GinIndex(OpClass(Upper('label'), name='gin_trgm_ops'), name='building_label_trgm_idx'),
+        ]
+
+
+@receiver(pre_save, sender=Building)
+def set_building_label(sender, instance, raw, **kwargs):
+    if not raw:
+        instance.label = instance.short_str_with_city()
+
+
+# Адреса связанных строений и домов пересчитываются запросами UPDATE в БД, без загрузки записей в память
+
+
+@receiver(post_save, sender=Building)
+def update_building_houses_labels(sender, instance, created, raw, **kwargs):
+    if not created and not raw:
+        with connection.cursor() as cursor:
+            refresh_house_labels(cursor, 'b.id = %s', [instance.pk])
+
 
+@receiver(post_save, sender=Street)
+def update_street_labels(sender, instance, created, raw, **kwargs):
+    if not created and not raw:
+        with connection.cursor() as cursor:
+            refresh_building_labels(cursor, 's.id = %s', [instance.pk])
+            refresh_house_labels(cursor, 'b.street_id = %s', [instance.pk])
 
-# @receiver(pre_save, sender=Building)
-# def check_unique_building(sender, instance, **kwargs):
-#     # Проверка уникальности комбинации номера и корпуса для каждой улицы перед сохранением объекта Building
-#     if Building.objects.filter(street=instance.street, number=instance.number, corpus=instance.corpus).exists():
-#         raise ValidationError("Здание с таким номером и корпусом уже существует на этой улице.")
+
+@receiver(post_save, sender=City)
+def update_city_labels(sender, instance, created, raw, **kwargs):
+    if not created and not raw:
+        with connection.cursor() as cursor:
+            refresh_building_labels(cursor, 'c.id = %s', [instance.pk])
+            refresh_house_labels(cursor, 'b.street_id IN (SELECT id FROM api_v1_street WHERE city_id = %s)',
+                                 [instance.pk])
 
 
 class WorkSchedule(models.Model):
@@ -145,9 +195,15 @@ class WorkDay(models.Model):
 
 @receiver(post_save, sender=WorkSchedule)
 def create_work_days(sender, instance, created, **kwargs):
+    # Дни недели создаются одним запросом. Если перед сохранением графику задан атрибут work_week
+    # (словарь {день недели: поля WorkDay}), дни создаются с переданными значениями, иначе - нерабочими
     if created:
-        for day_of_week in range(1, 8):
-            WorkDay.objects.create(schedule=instance, day_of_week=day_of_week, is_not_working=True)
+        work_week = getattr(instance, 'work_week', None) or {}
+        WorkDay.objects.bulk_create([
+            WorkDay(schedule=instance, day_of_week=day_of_week,
+                    **work_week.get(day_of_week, {'is_not_working': True}))
+            for day_of_week in range(1, 8)
+        ])
 
 
 class Office(models.Model):
@@ -190,6 +246,7 @@ class House(models.Model):
 
     complex = models.ForeignKey(HousingComplex, on_delete=models.CASCADE, null=False, verbose_name='Жилой комплекс')
     address = models.ForeignKey(Building, on_delete=models.CASCADE, null=False, verbose_name='Адрес')
+    label = models.CharField(max_length=255, default='', editable=False, verbose_name='Полный адрес')
 
     def __str__(self):
         return f'{self.complex.__str__()}: {self.address.short_str_with_city()}'
@@ -197,9 +254,57 @@ class House(models.Model):
     def short_str(self):
         return f'{self.address.short_str()}'
 
+    def build_label(self):
+        return house_label(self.complex.name, self.address.label)
+
     class Meta:
         verbose_name = 'Жилой дом'
         verbose_name_plural = 'Жилые дома'
+        indexes = [
+            # Сортировка по адресу (список жилых домов, админка)
+            models.Index(fields=['label'], name='house_label_idx'),
+            # Поиск жилого дома по подстроке адреса (label__icontains)
+            GinIndex(OpClass(Upper('label'), name='gin_trgm_ops'), name='house_label_trgm_idx'),
+        ]
+
+
+@receiver(pre_save, sender=House)
+def set_house_label(sender, instance, raw, **kwargs):
+    if not raw:
+        instance.label = instance.build_label()
+
+
+@receiver(post_save, sender=HousingComplex)
+def update_complex_labels(sender, instance, created, raw, **kwargs):
+    if not created and not raw:
+        with connection.cursor() as cursor:
+            refresh_house_labels(cursor, 'hc.id = %s', [instance.pk])
+
+
+class ResidentQuerySet(models.QuerySet):
+    def search(self, query):
+        """
+        Поиск жителей: числа ищутся в номере телефона и tgID, первое слово - в фамилии,
+        остальные слова - в начале имени или отчества (см. индексы resident_*_trgm_idx)
+        """
+
+        queryset = self
+        words = []
+        for word in query.split():
+            digits = word.lstrip('+')
+            if digits.isdigit():
+                condition = models.Q(phone__contains=digits)
+                if int(digits) < 2 ** 63:
+                    condition |= models.Q(tg_id=int(digits))
+                queryset = queryset.filter(condition)
+            else:
+                words.append(word)
+
+        if words:
+            queryset = queryset.filter(surname__icontains=words[0])
+            for word in words[1:]:
+                queryset = queryset.filter(models.Q(name__istartswith=word) | models.Q(patronymic__istartswith=word))
+        return queryset
 
 
 class Resident(models.Model):
@@ -213,6 +318,8 @@ class Resident(models.Model):
     phone = models.CharField(max_length=15, null=False, verbose_name='Номер телефона')
     tg_id = models.BigIntegerField(unique=True, null=True, blank=True, verbose_name='ID пользователя в Telegram')
 
+    objects = ResidentQuerySet.as_manager()
+
     def __str__(self):
         if self.patronymic:
             return f'{self.surname} {self.name} {self.patronymic}'
@@ -228,6 +335,11 @@ class Resident(models.Model):
     class Meta:
         verbose_name = 'Житель'
         verbose_name_plural = 'Жители'
+        indexes = [
+            # Поиск жителя по подстроке фамилии (surname__icontains) и номера телефона (phone__contains)
+            GinIndex(OpClass(Upper('surname'), name='gin_trgm_ops'), name='resident_surname_trgm_idx'),
+            GinIndex(OpClass('phone', name='gin_trgm_ops'), name='resident_phone_trgm_idx'),
+        ]
 
 
 class ExecutionStatus(models.Model):
@@ -336,6 +448,13 @@ def get_request_photo_path(instance, filename=None):
     return f'request/{instance.resident.tg_id}/{filename}'
 
 
+class RequestManager(models.Manager):
+    def get_queryset(self):
+        # Поисковый вектор (по размеру сопоставим с текстом) нужен только в условиях поиска,
+        # поэтому при выборке заявок он не загружается
+        return super().get_queryset().defer('search_vector')
+
+
 class Request(models.Model):
     """
     Модель обращения в АДС УК
@@ -348,6 +467,12 @@ class Request(models.Model):
     address = models.ForeignKey(House, on_delete=models.CASCADE, null=False, verbose_name='Адрес заявки')
     apartment = models.IntegerField(null=True, blank=True, verbose_name='Номер квартиры')
     photo = models.ImageField(upload_to=get_request_photo_path, null=True, blank=True, verbose_name='Фото обращения')
+    # file_id фото, отправленного ботом сотрудников: повторно фото отправляется по нему, без загрузки файла
+    photo_file_id = models.CharField(max_length=255, blank=True, default='', verbose_name='file_id фото в Telegram')
+    # Заполняется триггером БД request_search_vector_update (см. миграцию 0006_request_search_vector)
+    search_vector = SearchVectorField(null=True, editable=False, verbose_name='Поисковый вектор текста')
+
+    objects = RequestManager()
 
     def __str__(self):
         local_time = timezone.localtime(self.created_at, timezone.get_current_timezone())
@@ -356,6 +481,28 @@ class Request(models.Model):
     class Meta:
         verbose_name = 'Заявка/Обращение'
         verbose_name_plural = 'Заявки/Обращения'
+        indexes = [
+            # Ленты новых и активных заявок (фильтр по статусу, сортировка по дате создания)
+            models.Index(fields=['status', 'created_at', 'id'], name='request_status_created_idx'),
+            models.Index(
+                fields=['created_at', 'id'],
+                condition=models.Q(status__in=[2, 3]),
+                name='request_active_created_idx'
+            ),
+            # Заявки жителя
+            models.Index(fields=['resident', 'created_at', 'id'], name='request_resident_created_idx'),
+            # Выгрузка и поиск по периоду создания (сначала новые)
+            models.Index(fields=['created_at', 'id'], name='request_created_idx'),
+            # Полнотекстовый поиск по тексту заявки
+            GinIndex(fields=['search_vector'], name='request_search_vector_idx'),
+        ]
+
+
+@receiver(pre_save, sender=Request)
+def reset_request_photo_file_id(sender, instance, raw, **kwargs):
+    # Фото удалено или новое фото ещё не записано в хранилище: сохранённый file_id относится к прежнему фото
+    if not raw and (not instance.photo or not instance.photo._committed):
+        instance.photo_file_id = ''
 
 
 class RequestTask(models.Model):
@@ -371,6 +518,14 @@ class RequestTask(models.Model):
     class Meta:
         verbose_name = 'Задача'
         verbose_name_plural = 'Задачи'
+        indexes = [
+            # Незавершённые задачи мастера
+            models.Index(
+                fields=['employee', 'id'],
+                condition=models.Q(status__in=[1, 2, 3]),
+                name='task_open_employee_idx'
+            ),
+        ]
 
 
 class BotsSettings(models.Model):
@@ -384,3 +539,80 @@ class BotsSettings(models.Model):
     class Meta:
         verbose_name = 'Токены ботов'
         verbose_name_plural = 'Токены ботов'
+
+
+class DataVersion(models.Model):
+    """
+    Модель счётчика версий справочника. Счётчик увеличивается при каждом сохранении или удалении
+    записей модели и используется для условных запросов (ETag/Last-Modified) к справочникам
+    """
+
+    name = models.CharField(max_length=100, primary_key=True, verbose_name='Модель')
+    version = models.BigIntegerField(default=0, null=False, verbose_name='Версия')
+    updated_at = models.DateTimeField(default=timezone.now, null=False, verbose_name='Дата и время изменения')
+
+    class Meta:
+        verbose_name = 'Версия справочника'
+        verbose_name_plural = 'Версии справочников'
+
+
+# Справочники, изменение которых отслеживается счётчиками DataVersion
+VERSIONED_MODELS = (City, Street, Building, Office, HousingComplex, House, Department, Position, Service)
+
+
+def bump_data_versions(*models_list):
+    """
+    Увеличение счётчиков версий моделей. Вызывается сигналами, а также массовыми операциями,
+    которые сигналы не отправляют (например, импорт реестра адресов)
+    """
+
+    names = {model._meta.label_lower for model in models_list}
+    now = timezone.now()
+    updated = DataVersion.objects.filter(name__in=names).update(version=models.F('version') + 1, updated_at=now)
+    if updated < len(names):
+        existing = set(DataVersion.objects.filter(name__in=names).values_list('name', flat=True))
+        DataVersion.objects.bulk_create(
+            [DataVersion(name=name, version=1, updated_at=now) for name in names - existing],
+            ignore_conflicts=True
+        )
+
+
+def get_data_versions(*models_list):
+    """
+    Текущие версии моделей в виде списка пар (модель, версия) и время последнего изменения
+    """
+
+    names = sorted({model._meta.label_lower for model in models_list})
+    versions = dict.fromkeys(names, 0)
+    updated_at = None
+    for name, version, changed_at in DataVersion.objects.filter(name__in=names).values_list(
+            'name', 'version', 'updated_at'):
+        versions[name] = version
+        updated_at = max(updated_at, changed_at) if updated_at else changed_at
+    return list(versions.items()), updated_at
+
+
+def update_data_version(sender, **kwargs):
+    # loaddata при каждом запуске контейнера сохраняет неизменённые записи фикстуры
+    if kwargs.get('raw'):
+        return
+    bump_data_versions(sender)
+
+
+# Приёмники подключаются к каждой модели отдельно: приёмник post_delete без sender
+# отключил бы быстрое удаление (без загрузки записей) для всех моделей проекта
+for versioned_model in VERSIONED_MODELS:
+    post_save.connect(update_data_version, sender=versioned_model, dispatch_uid=versioned_model._meta.label_lower)
+    post_delete.connect(update_data_version, sender=versioned_model, dispatch_uid=versioned_model._meta.label_lower)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_auth_tokens(sender, instance, **kwargs):
+    # Права и активность пользователя могли измениться, кэшированные токены больше не актуальны
+    invalidate_user_tokens(instance)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_auth_token(sender, instance, **kwargs):
+    # Выход из системы (удаление токена) и удаление пользователя
+    token_cache.delete(instance.key)
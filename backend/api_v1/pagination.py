@@ -0,0 +1,25 @@
+from rest_framework.pagination import CursorPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Курсорная пагинация списков заявок по дате создания.
+    Включается только при передаче параметра page_size, без него возвращается полный список
+    """
+
+    page_size = None
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = ('created_at', 'id')
+
+
+class IdCursorPagination(CursorPagination):
+    """
+    Курсорная пагинация списков по первичному ключу (для моделей без даты создания).
+    Включается только при передаче параметра page_size, без него возвращается полный список
+    """
+
+    page_size = None
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = ('id',)
@@ -0,0 +1,143 @@
+import csv
+import datetime
+import json
+import zlib
+
+from django.utils import timezone
+
+from .models import Request
+
+
+FORMATS = ('csv', 'ndjson')
+
+COLUMNS = (
+    'request_id', 'created_at', 'status', 'office', 'address', 'apartment',
+    'resident', 'resident_phone', 'text',
+    'task_id', 'task_service', 'task_employee', 'task_status',
+)
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+}
+
+# Размер порции, которой строки забираются из серверного курсора и отдаются клиенту
+CHUNK_SIZE = 2000
+BUFFER_SIZE = 64 * 1024
+
+
+def filter_by_created_date(queryset, date_from=None, date_to=None):
+    """
+    Фильтр заявок по дате создания. Границы периода включительные и считаются в часовом поясе проекта.
+    Сравнение идёт по самому полю created_at, чтобы использовались индексы
+    """
+
+    if date_from:
+        queryset = queryset.filter(created_at__gte=timezone.make_aware(
+            datetime.datetime.combine(date_from, datetime.time.min)
+        ))
+    if date_to:
+        queryset = queryset.filter(created_at__lt=timezone.make_aware(
+            datetime.datetime.combine(date_to + datetime.timedelta(days=1), datetime.time.min)
+        ))
+    return queryset
+
+
+def get_export_queryset(date_from=None, date_to=None, office=None, statuses=None):
+    """
+    Заявки, объединённые с их задачами (по строке на задачу, заявка без задач - одна строка)
+    """
+
+    queryset = filter_by_created_date(Request.objects.all(), date_from, date_to)
+    if office:
+        queryset = queryset.filter(address__complex__office_id=office)
+    if statuses:
+        queryset = queryset.filter(status_id__in=statuses)
+
+    return queryset.order_by('created_at', 'id', 'requesttask__id').values_list(
+        'id', 'created_at', 'status__name', 'address__complex__office__name', 'address__label', 'apartment',
+        'resident__surname', 'resident__name', 'resident__patronymic', 'resident__phone', 'text',
+        'requesttask__id', 'requesttask__service__name',
+        'requesttask__employee__surname', 'requesttask__employee__name', 'requesttask__employee__patronymic',
+        'requesttask__status__name',
+    )
+
+
+def join_name(*parts):
+    return ' '.join(part for part in parts if part) or None
+
+
+def iter_export_rows(queryset):
+    """
+    Построчный обход выгрузки через серверный курсор, без загрузки всего запроса в память
+    """
+
+    current_timezone = timezone.get_current_timezone()
+    for (request_id, created_at, status, office, address, apartment,
+         resident_surname, resident_name, resident_patronymic, resident_phone, text,
+         task_id, task_service, employee_surname, employee_name, employee_patronymic,
+         task_status) in queryset.iterator(chunk_size=CHUNK_SIZE):
+        yield (
+            request_id,
+            timezone.localtime(created_at, current_timezone).isoformat(),
+            status,
+            office,
+            address,
+            apartment,
+            join_name(resident_surname, resident_name, resident_patronymic),
+            resident_phone,
+            text,
+            task_id,
+            task_service,
+            join_name(employee_surname, employee_name, employee_patronymic),
+            task_status,
+        )
+
+
+class _LineBuffer:
+    """
+    Псевдофайл для csv.writer, возвращающий записанную строку вместо её сохранения
+    """
+
+    def write(self, value):
+        return value
+
+
+def iter_export_lines(rows, file_format):
+    if file_format == 'csv':
+        writer = csv.writer(_LineBuffer())
+        yield writer.writerow(COLUMNS)
+        for row in rows:
+            yield writer.writerow(row)
+    elif file_format == 'ndjson':
+        for row in rows:
+            yield json.dumps(dict(zip(COLUMNS, row)), ensure_ascii=False) + '\n'
+    else:
+        raise ValueError(f'Неизвестный формат {file_format}. Поддерживаются csv и ndjson')
+
+
+def iter_export(queryset, file_format, compress=False):
+    """
+    Выгрузка заявок порциями байтов (при compress=True - в формате gzip)
+    """
+
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    buffer = []
+    buffered = 0
+
+    for line in iter_export_lines(iter_export_rows(queryset), file_format):
+        buffer.append(line)
+        buffered += len(line)
+        if buffered >= BUFFER_SIZE:
+            chunk = ''.join(buffer).encode()
+            buffer, buffered = [], 0
+            if compressor:
+                chunk = compressor.compress(chunk)
+            if chunk:
+                yield chunk
+
+    chunk = ''.join(buffer).encode()
+    if compressor:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
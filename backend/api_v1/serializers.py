@@ -1,5 +1,8 @@
 from rest_framework import serializers
+from rest_framework.validators import UniqueTogetherValidator
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Prefetch
 
 from .models import *
 
@@ -10,10 +13,7 @@ class BuildingLstSerializer(serializers.ModelSerializer):
     Сериализатор для получения списка всех адресов (жилые и не жилые здания)
     """
 
-    name = serializers.SerializerMethodField(method_name='get_name')
-
-    @staticmethod
-    def get_name(obj): return str(obj.short_str_with_city())
+    name = serializers.CharField(source='label', read_only=True)
 
     class Meta:
         model = Building
@@ -25,11 +25,78 @@ class BuildingCrtDelSerializer(serializers.ModelSerializer):
     Сериализатор для создания и удаления адреса
     """
 
+    @staticmethod
+    def validate_corpus(value):
+        return value.strip() or None if value else None
+
+    def validate(self, data):
+        if Building.objects.filter(street=data['street'], number=data['number'], corpus=data.get('corpus')).exists():
+            raise serializers.ValidationError('Здание с таким номером и корпусом уже существует на этой улице')
+        return data
+
     class Meta:
         model = Building
         fields = '__all__'
 
 
+class BuildingNestedCrtSerializer(serializers.Serializer):
+    """
+    Сериализатор для создания адреса вместе с городом и улицей за один запрос.
+    Город и улица передаются либо первичным ключом, либо названием (тогда они находятся или создаются).
+    Если такой адрес уже существует, возвращается существующий
+    """
+
+    city = serializers.PrimaryKeyRelatedField(queryset=City.objects.all(), required=False, allow_null=True)
+    city_name = serializers.CharField(max_length=40, required=False)
+    street = serializers.PrimaryKeyRelatedField(queryset=Street.objects.all(), required=False, allow_null=True)
+    street_name = serializers.CharField(max_length=100, required=False)
+    number = serializers.IntegerField()
+    corpus = serializers.CharField(max_length=5, required=False, allow_blank=True, allow_null=True)
+
+    @staticmethod
+    def validate_corpus(value):
+        return value.strip() or None if value else None
+
+    def validate(self, data):
+        if data.get('street') is None:
+            if not data.get('street_name'):
+                raise serializers.ValidationError('Необходимо указать улицу или название новой улицы')
+            if data.get('city') is None and not data.get('city_name'):
+                raise serializers.ValidationError('Необходимо указать город или название нового города')
+        return data
+
+    @transaction.atomic
+    def create(self, validated_data):
+        street = validated_data.get('street')
+        if street is None:
+            city = validated_data.get('city')
+            if city is None:
+                city, _ = City.objects.get_or_create(name=validated_data['city_name'].strip())
+            street, _ = Street.objects.get_or_create(city=city, name=validated_data['street_name'].strip())
+
+        building, self.created = Building.objects.get_or_create(
+            street=street,
+            number=validated_data['number'],
+            corpus=validated_data.get('corpus')
+        )
+        return building
+
+    def to_representation(self, instance):
+        data = BuildingLstSerializer(instance).data
+        data['created'] = self.created
+        return data
+
+
+class AddressImportSerializer(serializers.Serializer):
+    """
+    Сериализатор для загрузки файла реестра адресов (CSV или NDJSON).
+    Если формат не указан, он определяется по расширению файла
+    """
+
+    file = serializers.FileField()
+    format = serializers.ChoiceField(choices=['csv', 'ndjson'], required=False)
+
+
 class BotTokensSerializer(serializers.ModelSerializer):
     """
     Сериализатор для получения и изменения настроек ботов
@@ -58,6 +125,13 @@ class StreetLstCrtSerializer(serializers.ModelSerializer):
     class Meta:
         model = Street
         fields = ['pk', 'city', 'name']
+        validators = [
+            UniqueTogetherValidator(
+                queryset=Street.objects.all(),
+                fields=['city', 'name'],
+                message='Улица с таким названием уже существует в этом городе',
+            ),
+        ]
 
 
 class HousingComplexLstCrtDelSerializer(serializers.ModelSerializer):
@@ -121,17 +195,34 @@ class HouseLstCrtDelSerializer(serializers.ModelSerializer):
     Сериализатор для получения списка всех жилых домов, создания и удаления жилого дома
     """
 
-    name = serializers.SerializerMethodField(method_name='get_name')
-
-    @staticmethod
-    def get_name(obj):
-        return str(obj.__str__())
+    name = serializers.CharField(source='label', read_only=True)
 
     class Meta:
         model = House
         fields = ['pk', 'name', 'complex', 'address']
 
 
+class AutocompleteSerializer(serializers.Serializer):
+    """
+    Сериализатор параметров поиска с подсказками (жилые дома, жители)
+    """
+
+    q = serializers.CharField(min_length=3, max_length=100)
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=20)
+
+
+class HouseAutocompleteSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор для получения подсказок по жилым домам
+    """
+
+    name = serializers.CharField(source='label', read_only=True)
+
+    class Meta:
+        model = House
+        fields = ['pk', 'name']
+
+
 class ComplexHousesLstSerializer(serializers.ModelSerializer):
     """
     Сериализатор для получения списка домов жилого комплекса
@@ -148,6 +239,34 @@ class ComplexHousesLstSerializer(serializers.ModelSerializer):
         fields = ['pk', 'name', 'complex', 'address']
 
 
+class CatalogSerializer(serializers.Serializer):
+    """
+    Сериализатор параметров получения справочника жилых комплексов и домов
+    """
+
+    since_version = serializers.IntegerField(min_value=0, required=False)
+
+
+class CatalogComplexSerializer(serializers.Serializer):
+    """
+    Сериализатор жилого комплекса в справочнике. Дома передаются парами [pk, короткий адрес]
+    """
+
+    pk = serializers.IntegerField()
+    name = serializers.CharField()
+    houses = serializers.ListField(child=serializers.ListField(min_length=2, max_length=2))
+
+
+class CatalogLstSerializer(serializers.Serializer):
+    """
+    Сериализатор справочника жилых комплексов и домов
+    """
+
+    version = serializers.IntegerField()
+    unchanged = serializers.BooleanField()
+    complexes = CatalogComplexSerializer(many=True, required=False)
+
+
 class OfficeLstCrtDelSerializer(serializers.ModelSerializer):
     """
     Сериализатор для получения списка всех УК, создания и удаления УК
@@ -196,6 +315,56 @@ class RequestShortInfoSerializer(serializers.ModelSerializer):
         fields = ['pk', 'date', 'address', 'info']
 
 
+class RequestExportSerializer(serializers.Serializer):
+    """
+    Сериализатор параметров выгрузки заявок с задачами
+    """
+
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    office = serializers.IntegerField(required=False)
+    status = serializers.ListField(child=serializers.IntegerField(), required=False)
+    export_format = serializers.ChoiceField(choices=['csv', 'ndjson'], default='csv')
+    gzip = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+        if data.get('date_from') and data.get('date_to') and data['date_from'] > data['date_to']:
+            raise serializers.ValidationError('Дата начала периода не может быть больше даты окончания')
+        return data
+
+
+class RequestSearchSerializer(serializers.Serializer):
+    """
+    Сериализатор параметров полнотекстового поиска заявок
+    """
+
+    q = serializers.CharField(max_length=200)
+    status = serializers.ListField(child=serializers.IntegerField(), required=False)
+    complex = serializers.IntegerField(required=False)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=200, default=50)
+
+    def validate(self, data):
+        if data.get('date_from') and data.get('date_to') and data['date_from'] > data['date_to']:
+            raise serializers.ValidationError('Дата начала периода не может быть больше даты окончания')
+        return data
+
+
+class RequestSearchLstSerializer(RequestShortInfoSerializer):
+    """
+    Сериализатор для получения результатов поиска заявок с короткой информацией,
+    статусом и релевантностью
+    """
+
+    status_name = serializers.CharField(source='status.name', read_only=True)
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Request
+        fields = ['pk', 'date', 'address', 'info', 'status_name', 'rank']
+
+
 class RequestDetSerializer(serializers.ModelSerializer):
     """
     Сериализатор для получения польной информации о заявке и получения списка заявок от пользователя TG
@@ -239,11 +408,13 @@ class RequestDetSerializer(serializers.ModelSerializer):
 
     @staticmethod
     def get_office_id(obj):
-        return obj.address.complex.office.pk
+        return obj.address.complex.office_id
 
     class Meta:
         model = Request
-        fields = ['pk', 'info', 'date', 'status_name', 'status', 'resident', 'address', 'complex', 'photo', 'office_id']
+        fields = ['pk', 'info', 'date', 'status_name', 'status', 'resident', 'address', 'complex', 'photo',
+                  'photo_file_id', 'office_id']
+        read_only_fields = ['photo_file_id']
 
 
 class RequestTaskInfoSerializer(serializers.ModelSerializer):
@@ -275,7 +446,29 @@ class RequestCrtSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Request
-        fields = '__all__'
+        exclude = ['search_vector', 'photo_file_id']
+
+
+class RequestPhotoFileIdSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор для сохранения file_id фото заявки, отправленного ботом сотрудников
+    """
+
+    def validate(self, data):
+        if not self.instance.photo:
+            raise serializers.ValidationError('У заявки нет фото')
+        return data
+
+    def update(self, instance, validated_data):
+        # Записывается только file_id и только пока у заявки то же фото, что было отправлено:
+        # сохранение всей заявки могло бы перезаписать фото или статус, изменённые параллельно
+        instance.photo_file_id = validated_data.get('photo_file_id', instance.photo_file_id)
+        Request.objects.filter(pk=instance.pk, photo=instance.photo.name).update(photo_file_id=instance.photo_file_id)
+        return instance
+
+    class Meta:
+        model = Request
+        fields = ['pk', 'photo_file_id']
 
 
 class WorkScheduleLstSerializer(serializers.ModelSerializer):
@@ -287,7 +480,7 @@ class WorkScheduleLstSerializer(serializers.ModelSerializer):
 
     @staticmethod
     def get_work_days(obj):
-        work_days = obj.work_days.all().order_by('day_of_week')
+        work_days = obj.work_days.all()
         serializer = WorkDayShortLstSerializer(work_days, many=True)
         return serializer.data
 
@@ -305,7 +498,7 @@ class WorkScheduleDetMngSerializer(serializers.ModelSerializer):
 
     @staticmethod
     def get_work_days(obj):
-        work_days = obj.work_days.all().order_by('day_of_week')
+        work_days = obj.work_days.all()
         serializer = WorkDayFullLstSerializer(work_days, many=True)
         return serializer.data
 
@@ -354,6 +547,103 @@ class WorkScheduleCrtDelSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+class WorkDayWeekSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор дня недели для создания и изменения графика работы целиком
+    """
+
+    day_of_week = serializers.ChoiceField(choices=WorkDay.DAY_CHOICES)
+
+    class Meta:
+        model = WorkDay
+        fields = ['day_of_week', 'is_not_working', 'start_time', 'end_time']
+
+    def validate(self, data):
+        if not data.get('is_not_working') and (data.get('start_time') is None or data.get('end_time') is None):
+            raise serializers.ValidationError('Для рабочего дня необходимо указать время начала и конца работы')
+        return data
+
+
+class WorkScheduleWeekSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор для создания и изменения графика работы вместе со всеми днями недели.
+    Дни, не переданные в work_days, считаются нерабочими
+    """
+
+    work_days = WorkDayWeekSerializer(many=True, required=False)
+
+    @staticmethod
+    def validate_work_days(value):
+        days = [day['day_of_week'] for day in value]
+        if len(days) != len(set(days)):
+            raise serializers.ValidationError('Каждый день недели может быть указан только один раз')
+        return value
+
+    @staticmethod
+    def get_work_week(work_days):
+        work_week = {
+            day_of_week: {'is_not_working': True, 'start_time': None, 'end_time': None}
+            for day_of_week in range(1, 8)
+        }
+        for day in work_days:
+            is_not_working = day.get('is_not_working', False)
+            work_week[day['day_of_week']] = {
+                'is_not_working': is_not_working,
+                'start_time': None if is_not_working else day['start_time'],
+                'end_time': None if is_not_working else day['end_time'],
+            }
+        return work_week
+
+    @transaction.atomic
+    def create(self, validated_data):
+        schedule = WorkSchedule(name=validated_data['name'])
+        schedule.work_week = self.get_work_week(validated_data.get('work_days', []))
+        schedule.save()
+        return schedule
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        if 'name' in validated_data and validated_data['name'] != instance.name:
+            instance.name = validated_data['name']
+            instance.save(update_fields=['name'])
+
+        if 'work_days' in validated_data:
+            work_week = self.get_work_week(validated_data['work_days'])
+            work_days = list(instance.work_days.all())
+            for work_day in work_days:
+                for field, value in work_week[work_day.day_of_week].items():
+                    setattr(work_day, field, value)
+            WorkDay.objects.bulk_update(work_days, ['is_not_working', 'start_time', 'end_time'])
+
+            # Недостающие дни недели (если график был создан не полностью)
+            existing_days = {work_day.day_of_week for work_day in work_days}
+            missing_days = [
+                WorkDay(schedule=instance, day_of_week=day_of_week, **fields)
+                for day_of_week, fields in work_week.items() if day_of_week not in existing_days
+            ]
+            if missing_days:
+                WorkDay.objects.bulk_create(missing_days)
+        return instance
+
+    def to_representation(self, instance):
+        instance = WorkSchedule.objects.prefetch_related(
+            Prefetch('work_days', queryset=WorkDay.objects.order_by('day_of_week'))
+        ).get(pk=instance.pk)
+        return WorkScheduleDetMngSerializer(instance).data
+
+    class Meta:
+        model = WorkSchedule
+        fields = ['id', 'name', 'work_days']
+
+
+class WorkScheduleCloneSerializer(serializers.Serializer):
+    """
+    Сериализатор для копирования графика работы
+    """
+
+    name = serializers.CharField(max_length=100, required=False)
+
+
 class ServiceLstCrtDelSerializer(serializers.ModelSerializer):
     """
     Сериализатор для получения списка всех типовых задач, создания и удаления типовой задачи
@@ -437,6 +727,22 @@ class ResidentLstSerializer(serializers.ModelSerializer):
         fields = ['pk', 'name']
 
 
+class ResidentAutocompleteSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор для получения подсказок по жителям (ФИО и номер телефона)
+    """
+
+    name = serializers.SerializerMethodField(method_name='get_name')
+
+    @staticmethod
+    def get_name(obj):
+        return f'{obj} ({obj.phone})'
+
+    class Meta:
+        model = Resident
+        fields = ['pk', 'name']
+
+
 class ResidentCrtSerializer(serializers.ModelSerializer):
     """
     Сериализатор для добавления нового жителя
@@ -0,0 +1,327 @@
+import io
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from .address_import import import_addresses
+from .models import *
+from .pagination import CreatedAtCursorPagination, IdCursorPagination
+from .views import ActiveRequestsView, NewRequestsView, TasksForMasterView, UserRequestsView
+
+
+PAGE_SIZE = 50
+
+STATUSES = {1: 'Новая', 2: 'В работе', 3: 'На проверке', 4: 'Завершена'}
+
+
+def create_statuses():
+    return {pk: ExecutionStatus.objects.create(pk=pk, name=name) for pk, name in STATUSES.items()}
+
+
+def create_house(number=1):
+    city = City.objects.get_or_create(name='Город')[0]
+    street = Street.objects.get_or_create(city=city, name=f'Улица {number % 3}')[0]
+    building = Building.objects.create(street=street, number=number)
+    office = Office.objects.create(name='УК', address=building, work_schedule=WorkSchedule.objects.create(name='График'))
+    housing_complex = HousingComplex.objects.create(name=f'ЖК {number}', office=office)
+    return House.objects.create(complex=housing_complex, address=building)
+
+
+def create_requests(house, residents, statuses, count):
+    """
+    Создание заявок одним запросом: статусы и жители чередуются по порядку
+    """
+
+    return Request.objects.bulk_create([
+        Request(text=f'Заявка {index}', status=statuses[index % len(statuses)],
+                resident=residents[index % len(residents)], address=house)
+        for index in range(count)
+    ])
+
+
+class RequestTaskIndexesTests(TestCase):
+    """
+    Планы запросов списков заявок и задач используют индексы из миграции 0002_request_task_indexes.
+    Данные распределены как в рабочей базе: почти все заявки и задачи завершены
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        statuses = create_statuses()
+        house = create_house()
+        cls.residents = Resident.objects.bulk_create([
+            Resident(name='Иван', surname=f'Житель{index}', phone=f'7900{index:07}', tg_id=index + 1)
+            for index in range(500)
+        ])
+        # 1% новых и 1% активных заявок
+        create_requests(house, cls.residents, [statuses[4]] * 98 + [statuses[1], statuses[2]], 30000)
+
+        position = Position.objects.create(name='Мастер', department=Department.objects.create(name='Отдел'))
+        service = Service.objects.create(name='Задача', description='Описание', position=position)
+        employees = Employee.objects.bulk_create([
+            Employee(name='Пётр', surname=f'Мастер{index}', patronymic='Петрович', phone=f'7911{index:07}',
+                     position=position, tg_id=index + 1)
+            for index in range(50)
+        ])
+        RequestTask.objects.bulk_create([
+            RequestTask(request=request, employee=employees[index % len(employees)], service=service,
+                        status=statuses[1] if index % 100 == 0 else statuses[4])
+            for index, request in enumerate(Request.objects.all()[:20000])
+        ])
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE api_v1_request, api_v1_requesttask, api_v1_resident, api_v1_employee')
+
+    def assertUsesIndex(self, queryset, index_name):
+        # Страница курсорной пагинации
+        plan = queryset[:PAGE_SIZE].explain()
+        self.assertIn(index_name, plan, plan)
+
+    def test_new_requests(self):
+        queryset = NewRequestsView.queryset.order_by(*CreatedAtCursorPagination.ordering)
+        self.assertUsesIndex(queryset, 'request_status_created_idx')
+
+    def test_active_requests(self):
+        queryset = ActiveRequestsView.queryset.order_by(*CreatedAtCursorPagination.ordering)
+        self.assertUsesIndex(queryset, 'request_active_created_idx')
+
+    def test_user_requests(self):
+        view = UserRequestsView(kwargs={'tgID': self.residents[0].tg_id})
+        queryset = view.get_queryset().order_by(*CreatedAtCursorPagination.ordering)
+        self.assertUsesIndex(queryset, 'request_resident_created_idx')
+
+    def test_tasks_for_master(self):
+        view = TasksForMasterView(kwargs={'tgID': 1})
+        queryset = view.get_queryset().order_by(*IdCursorPagination.ordering)
+        self.assertUsesIndex(queryset, 'task_open_employee_idx')
+
+
+class WorkScheduleQueriesTests(TestCase):
+    """
+    Дни недели графиков работы загружаются одним запросом для всего списка
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('admin')
+        # При создании графика создаются все 7 дней недели
+        cls.schedules = [WorkSchedule.objects.create(name=f'График {index}') for index in range(5)]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_list(self):
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/v1/schedule/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 5)
+        for schedule in response.data:
+            self.assertEqual([day['resume'].split()[0] for day in schedule['work_days']],
+                             [name for day_of_week, name in WorkDay.DAY_CHOICES])
+
+    def test_detail(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/v1/schedule/{self.schedules[0].pk}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([day['day_of_week'] for day in response.data['work_days']], list(range(1, 8)))
+
+
+class RequestListQueriesTests(TestCase):
+    """
+    Списки новых и активных заявок загружаются одним запросом вместе с адресами (без поискового вектора),
+    независимо от количества заявок и адресов
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('admin')
+        cls.statuses = create_statuses()
+        cls.residents = [Resident.objects.create(name='Иван', surname='Житель', phone='79000000000')]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add_requests(self, houses_count, requests_per_house):
+        statuses = [self.statuses[1], self.statuses[2], self.statuses[3]]
+        for number in range(House.objects.count() + 1, House.objects.count() + houses_count + 1):
+            create_requests(create_house(number), self.residents, statuses, requests_per_house)
+
+    def assertListQueries(self, url, status_ids):
+        for houses_count in (1, 10):
+            self.add_requests(houses_count, 6)
+            with self.assertNumQueries(1) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            # Поисковый вектор не загружается
+            self.assertNotIn('search_vector', queries[0]['sql'])
+            self.assertEqual(len(response.data), Request.objects.filter(status__in=status_ids).count())
+
+    def test_new_requests(self):
+        self.assertListQueries('/api/v1/requests/new', [1])
+
+    def test_active_requests(self):
+        self.assertListQueries('/api/v1/requests/active', [2, 3])
+
+    def test_paginated_requests(self):
+        self.add_requests(10, 6)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/v1/requests/active', {'page_size': 5})
+        self.assertEqual(len(response.data['results']), 5)
+
+
+class RequestPhotoFileIdTests(TestCase):
+    """
+    Сохранение file_id фото заявки и его сброс при удалении или замене фото
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('admin')
+        statuses = create_statuses()
+        resident = Resident.objects.create(name='Иван', surname='Житель', phone='79000000000')
+        cls.request = create_requests(create_house(), [resident], [statuses[1]], 1)[0]
+        Request.objects.filter(pk=cls.request.pk).update(photo='request_photos/photo.jpg')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_saves_only_file_id(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.put(f'/api/v1/request/{self.request.pk}/photo-file-id',
+                                       {'photo_file_id': 'file_id'})
+        self.assertEqual(response.status_code, 200)
+        update_sql = queries[-1]['sql']
+        self.assertTrue(update_sql.startswith('UPDATE'), update_sql)
+        self.assertNotIn('"text"', update_sql)
+        self.assertEqual(Request.objects.get(pk=self.request.pk).photo_file_id, 'file_id')
+
+    def test_request_without_photo(self):
+        Request.objects.filter(pk=self.request.pk).update(photo='')
+        response = self.client.put(f'/api/v1/request/{self.request.pk}/photo-file-id', {'photo_file_id': 'file_id'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Request.objects.get(pk=self.request.pk).photo_file_id, '')
+
+    def test_photo_removal_resets_file_id(self):
+        request = Request.objects.get(pk=self.request.pk)
+        request.photo_file_id = 'file_id'
+        request.save()
+        self.assertEqual(request.photo_file_id, 'file_id')
+
+        request.photo = None
+        request.save()
+        request.refresh_from_db()
+        self.assertEqual(request.photo_file_id, '')
+
+
+class DataVersionTests(TestCase):
+    """
+    Счётчики DataVersion меняются при изменении данных, но не при загрузке фикстур
+    """
+
+    def test_save_bumps_version(self):
+        City.objects.create(name='Город')
+        self.assertEqual(get_data_versions(City)[0], [('api_v1.city', 1)])
+
+    def test_loaddata_keeps_version(self):
+        City(pk=1, name='Город').save_base(raw=True)
+        self.assertEqual(get_data_versions(City)[0], [('api_v1.city', 0)])
+
+
+class TokenCacheTests(TestCase):
+    """
+    Без общего для процессов кэша (REDIS_URL) токены не кэшируются:
+    отозванный токен сразу перестаёт действовать во всех процессах
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.token = Token.objects.create(user=User.objects.create_superuser('admin'))
+
+    def get_schedules(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/v1/schedule/', HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        return response, [query['sql'] for query in queries]
+
+    def test_token_is_checked_on_every_request(self):
+        for attempt in range(2):
+            response, queries = self.get_schedules()
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(any('authtoken_token' in sql for sql in queries))
+
+    def test_revoked_token(self):
+        self.get_schedules()
+        Token.objects.filter(pk=self.token.pk).delete()
+        response, queries = self.get_schedules()
+        self.assertEqual(response.status_code, 401)
+
+
+class AddressImportTests(TestCase):
+    """
+    Импорт реестра адресов добавляет только недостающие записи и заполняет сохранённые адреса
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.house = create_house()
+        complex_id = cls.house.complex_id
+        cls.csv = (
+            'city,street,number,corpus,complex\n'
+            f'Город,Улица 1,1,,{complex_id}\n'
+            f'Город,Улица 1,2,,{complex_id}\n'
+            f'Город,Улица 1,2,,{complex_id}\n'
+            'Город,Улица 1,2,А,\n'
+            f'Новгород,Ленина,10,1,{complex_id}\n'
+            'Новгород,Ленина,abc,,\n'
+        )
+
+    def import_csv(self):
+        return import_addresses(io.StringIO(self.csv), 'csv')
+
+    def test_import_twice(self):
+        self.assertEqual(self.import_csv(), {
+            'rows': 5, 'skipped': 1, 'cities': 1, 'streets': 1, 'buildings': 3, 'houses': 2,
+        })
+        self.assertEqual(self.import_csv(), {
+            'rows': 5, 'skipped': 1, 'cities': 0, 'streets': 0, 'buildings': 0, 'houses': 0,
+        })
+
+        self.assertEqual(City.objects.count(), 2)
+        self.assertEqual(Street.objects.count(), 2)
+        self.assertEqual(Building.objects.count(), 4)
+        self.assertEqual(House.objects.count(), 3)
+
+    def test_labels(self):
+        self.import_csv()
+
+        self.assertEqual(Building.objects.get(street__name='Ленина').label, 'г. Новгород, ул. Ленина, д. 10/1')
+        self.assertEqual(House.objects.get(address__street__name='Ленина').label,
+                         'ЖК 1: г. Новгород, ул. Ленина, д. 10/1')
+        for building in Building.objects.select_related('street__city'):
+            self.assertEqual(building.label, building.short_str_with_city())
+        for house in House.objects.select_related('complex', 'address'):
+            self.assertEqual(house.label, house.build_label())
+
+    def test_data_versions(self):
+        self.import_csv()
+        versions = dict(get_data_versions(City, Street, Building, House)[0])
+        self.import_csv()
+        # Повторный импорт ничего не добавляет, поэтому версии справочников не меняются
+        self.assertEqual(dict(get_data_versions(City, Street, Building, House)[0]), versions)
+
+    def test_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', encoding='utf-8') as file:
+            file.write(self.csv)
+            file.flush()
+            output = io.StringIO()
+            call_command('import_addresses', file.name, stdout=output)
+        self.assertIn('Строк: 5, пропущено: 1', output.getvalue())
+        self.assertIn('адресов: 3, жилых домов: 2', output.getvalue())
@@ -6,10 +6,14 @@ urlpatterns = [
     # Используемые
     path('address/', views.BuildingListView.as_view(), name='address_list'),
     path('address/create/', views.BuildingCreateView.as_view(), name='address_create'),
+    path('address/create/nested/', views.BuildingNestedCreateView.as_view(), name='address_nested_create'),
+    path('address/import/', views.AddressImportView.as_view(), name='address_import'),
     path('address/delete/<int:pk>', views.BuildingDeleteView.as_view(), name='address_delete'),
 
     path('bottokens/manage/<int:pk>', views.BotTokensUpdateView.as_view(), name='bottokens_manage'),
 
+    path('catalog/', views.CatalogView.as_view(), name='catalog'),
+
     path('city/', views.CityListView.as_view(), name='city_list'),
     path('city/<int:pk>/streets', views.CityStreetsListView.as_view(), name='city_streets_list'),
     path('city/create/', views.CityCreateView.as_view(), name='city_create'),
@@ -28,6 +32,7 @@ urlpatterns = [
     path('employee/delete/<int:pk>', views.EmployeeDeleteView.as_view(), name='employee_delete'),
 
     path('house/', views.HouseListView.as_view(), name='house_list'),
+    path('house/search/', views.HouseAutocompleteView.as_view(), name='house_search'),
     path('house/create/', views.HouseCreateView.as_view(), name='house_create'),
     path('house/delete/<int:pk>', views.HouseDeleteView.as_view(), name='house_delete'),
 
@@ -43,10 +48,14 @@ urlpatterns = [
     path('requests/active', views.ActiveRequestsView.as_view(), name='active_requests'),
     path('request/<int:pk>', views.RequestDetailView.as_view(), name='request_detail'),
     path('request/<int:pk>/tasks', views.RequestTasksView.as_view(), name='request_tasks'),
+    path('request/<int:pk>/photo-file-id', views.RequestPhotoFileIdView.as_view(), name='request_photo_file_id'),
+    path('requests/search/', views.RequestSearchView.as_view(), name='requests_search'),
+    path('requests/export/', views.RequestExportView.as_view(), name='requests_export'),
     path('request/create/', views.RequestCreateView.as_view(), name='request_create'),
     path('requests/from-user/<int:tgID>', views.UserRequestsView.as_view(), name='new_requests'),
 
     path('resident/', views.ResidentListView.as_view(), name='resident_list'),
+    path('resident/search/', views.ResidentAutocompleteView.as_view(), name='resident_search'),
     path('resident/create/', views.ResidentCreateView.as_view(), name='resident_create'),
     path('resident/by_tgid/<int:tgID>', views.ResidentByTgView.as_view(), name='resident_byTG'),
 
@@ -55,6 +64,9 @@ urlpatterns = [
     path('schedule/workday/manage/<int:pk>', views.WorkDayManageView.as_view(), name='workday_manage'),
     path('schedule/create/', views.WorkScheduleCreateView.as_view(), name='schedule_create'),
     path('schedule/delete/<int:pk>', views.WorkScheduleDeleteView.as_view(), name='schedule_delete'),
+    path('schedule/week/create/', views.WorkScheduleWeekCreateView.as_view(), name='schedule_week_create'),
+    path('schedule/week/manage/<int:pk>', views.WorkScheduleWeekManageView.as_view(), name='schedule_week_manage'),
+    path('schedule/clone/<int:pk>', views.WorkScheduleCloneView.as_view(), name='schedule_clone'),
 
     path('street/create/', views.StreetCreateView.as_view(), name='street_create'),
 
@@ -1,13 +1,25 @@
+import io
+
 from rest_framework import generics
 from rest_framework.views import APIView
+from rest_framework.parsers import MultiPartParser
 
 from .permissions import *
+from .pagination import CreatedAtCursorPagination, IdCursorPagination
+from .conditional import DataVersionConditionalMixin
+from .catalog import build_catalog, get_catalog_version
+from .address_import import AddressImportError, guess_format, import_addresses
+from .request_export import CONTENT_TYPES, filter_by_created_date, get_export_queryset, iter_export
 from rest_framework import status
 from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema, inline_serializer, OpenApiExample
+from drf_spectacular.types import OpenApiTypes
+from django.http import StreamingHttpResponse
 
 from .serializers import *
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import F, Q, Prefetch
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity, TrigramWordSimilarity
 
 """
 Permissions:
@@ -18,11 +30,12 @@ AllowAny - Любой пользователь
 
 
 # Используемые
-class BuildingListView(generics.ListAPIView):
+class BuildingListView(DataVersionConditionalMixin, generics.ListAPIView):
     """Список всех адресов"""
-    queryset = Building.objects.all()
+    queryset = Building.objects.only('pk', 'label').order_by('label')
     serializer_class = BuildingLstSerializer
     permission_classes = ((IsSuperuser | IsStaff),)
+    etag_models = (Building, Street, City)
 
     @extend_schema(
         summary="Список всех адресов",
@@ -78,6 +91,113 @@ class BuildingCreateView(generics.CreateAPIView):
         return super().post(request, *args, **kwargs)
 
 
+class BuildingNestedCreateView(generics.CreateAPIView):
+    """Добавление нового адреса вместе с городом и улицей"""
+    queryset = Building.objects.all()
+    serializer_class = BuildingNestedCrtSerializer
+    permission_classes = (IsSuperuser,)
+
+    @extend_schema(
+        summary="Добавление нового адреса вместе с городом и улицей",
+        description="Поиск или создание города, улицы и адреса за один запрос. "
+                    "Если адрес уже существует, возвращается существующий адрес (created=false).",
+        request=serializer_class,
+        responses={
+            status.HTTP_201_CREATED: inline_serializer(
+                name="NestedAddressCreatedResponse",
+                fields={
+                    'pk': serializers.IntegerField(),
+                    'name': serializers.CharField(),
+                    'created': serializers.BooleanField(),
+                }
+            ),
+            status.HTTP_200_OK: inline_serializer(
+                name="NestedAddressExistingResponse",
+                fields={
+                    'pk': serializers.IntegerField(),
+                    'name': serializers.CharField(),
+                    'created': serializers.BooleanField(default=False),
+                }
+            ),
+            status.HTTP_400_BAD_REQUEST: inline_serializer(
+                name="BadRequestResponse",
+                fields={"detail": serializers.CharField(default="Неверный запрос")}
+            ),
+            status.HTTP_401_UNAUTHORIZED: inline_serializer(
+                name="UnauthorizedResponse",
+                fields={"detail": serializers.CharField(default="Неавторизованный доступ")}
+            ),
+            status.HTTP_403_FORBIDDEN: inline_serializer(
+                name="ForbiddenResponse",
+                fields={"detail": serializers.CharField(default="Доступ запрещен")}
+            ),
+        },
+        tags=["address"]
+    )
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(
+            serializer.data,
+            status=status.HTTP_201_CREATED if serializer.created else status.HTTP_200_OK
+        )
+
+
+class AddressImportView(generics.GenericAPIView):
+    """Импорт реестра адресов"""
+    serializer_class = AddressImportSerializer
+    permission_classes = (IsSuperuser,)
+    parser_classes = (MultiPartParser,)
+
+    @extend_schema(
+        summary="Импорт реестра адресов",
+        description="Загрузка файла реестра (CSV или NDJSON с полями city, street, number, corpus, complex). "
+                    "Недостающие города, улицы, адреса и жилые дома добавляются, существующие не изменяются. "
+                    "Поле complex (id жилого комплекса) необязательно.",
+        request=serializer_class,
+        responses={
+            status.HTTP_200_OK: inline_serializer(
+                name="AddressImportResponse",
+                fields={
+                    'rows': serializers.IntegerField(),
+                    'skipped': serializers.IntegerField(),
+                    'cities': serializers.IntegerField(),
+                    'streets': serializers.IntegerField(),
+                    'buildings': serializers.IntegerField(),
+                    'houses': serializers.IntegerField(),
+                }
+            ),
+            status.HTTP_400_BAD_REQUEST: inline_serializer(
+                name="BadRequestResponse",
+                fields={"detail": serializers.CharField(default="Неверный запрос")}
+            ),
+            status.HTTP_401_UNAUTHORIZED: inline_serializer(
+                name="UnauthorizedResponse",
+                fields={"detail": serializers.CharField(default="Неавторизованный доступ")}
+            ),
+            status.HTTP_403_FORBIDDEN: inline_serializer(
+                name="ForbiddenResponse",
+                fields={"detail": serializers.CharField(default="Доступ запрещен")}
+            ),
+        },
+        tags=["address"]
+    )
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = serializer.validated_data['file']
+
+        try:
+            file_format = serializer.validated_data.get('format') or guess_format(upload.name)
+            stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+            result = import_addresses(stream, file_format)
+        except (AddressImportError, UnicodeDecodeError) as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(result, status=status.HTTP_200_OK)
+
+
 class BuildingDeleteView(generics.DestroyAPIView):
     """Удаление адреса"""
     queryset = Building.objects.all()
@@ -284,11 +404,12 @@ class CityCreateView(generics.CreateAPIView):
         return super().post(request, *args, **kwargs)
 
 
-class HousingComplexListView(generics.ListAPIView):
+class HousingComplexListView(DataVersionConditionalMixin, generics.ListAPIView):
     """Список всех жилых комплексов"""
     queryset = HousingComplex.objects.all()
     serializer_class = HousingComplexLstCrtDelSerializer
     permission_classes = ((IsSuperuser | IsStaff),)
+    etag_models = (HousingComplex,)
 
     @extend_schema(
         summary="Список всех жилых комплексов",
@@ -377,16 +498,17 @@ class HousingComplexDeleteView(generics.DestroyAPIView):
         return super().delete(request, *args, **kwargs)
 
 
-class HousingComplexHousesListView(generics.ListAPIView):
+class HousingComplexHousesListView(DataVersionConditionalMixin, generics.ListAPIView):
     """Список домов комплекса"""
 
     serializer_class = ComplexHousesLstSerializer
     permission_classes = ((IsSuperuser | IsStaff),)
+    etag_models = (House, Building, Street)
 
     def get_queryset(self):
         return House.objects.filter(
             complex_id=self.kwargs.get('pk')
-        )
+        ).select_related('address__street')
 
     @extend_schema(
         summary="Список всех домов жилого комплекса",
@@ -412,11 +534,57 @@ class HousingComplexHousesListView(generics.ListAPIView):
         return super().get(request, *args, **kwargs)
 
 
-class DepartmentListView(generics.ListAPIView):
+class CatalogView(generics.GenericAPIView):
+    """Справочник жилых комплексов и домов"""
+    serializer_class = CatalogLstSerializer
+    permission_classes = ((IsSuperuser | IsStaff),)
+
+    @extend_schema(
+        summary="Справочник жилых комплексов и домов",
+        description="Получение всех жилых комплексов с их домами одним документом. "
+                    "Дома передаются парами [pk, короткий адрес]. "
+                    "Если since_version совпадает с текущей версией справочника, возвращается только "
+                    "version и unchanged=true без чтения самого справочника.",
+        parameters=[CatalogSerializer],
+        responses={
+            status.HTTP_200_OK: serializer_class(),
+            status.HTTP_400_BAD_REQUEST: inline_serializer(
+                name="BadRequestResponse",
+                fields={"detail": serializers.CharField(default="Неверный запрос")}
+            ),
+            status.HTTP_401_UNAUTHORIZED: inline_serializer(
+                name="UnauthorizedResponse",
+                fields={"detail": serializers.CharField(default="Неавторизованный доступ")}
+            ),
+            status.HTTP_403_FORBIDDEN: inline_serializer(
+                name="ForbiddenResponse",
+                fields={"detail": serializers.CharField(default="Доступ запрещен")}
+            ),
+        },
+        tags=["complex"]
+    )
+    def get(self, request, *args, **kwargs):
+        params = CatalogSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        # Версия читается до справочника: изменение между запросами приведёт к повторной загрузке,
+        # но не к устаревшим данным под новой версией
+        version = get_catalog_version()
+        if params.validated_data.get('since_version') == version:
+            return Response({'version': version, 'unchanged': True}, status=status.HTTP_200_OK)
+
+        return Response(
+            {'version': version, 'unchanged': False, 'complexes': build_catalog()},
+            status=status.HTTP_200_OK
+        )
+
+
+class DepartmentListView(DataVersionConditionalMixin, generics.ListAPIView):
     """Список всех отделов"""
     queryset = Department.objects.all()
     serializer_class = DepartmentLstCrtDelSerializer
     permission_classes = (IsSuperuser,)
+    etag_models = (Department,)
 
     @extend_schema(
         summary="Список всех отделов",
@@ -510,6 +678,7 @@ class EmployeeShortListView(generics.ListAPIView):
     queryset = Employee.objects.all()
     serializer_class = EmployeeLstSerializer
     permission_classes = (IsSuperuser,)
+    pagination_class = IdCursorPagination
 
     @extend_schema(
         summary="Список всех сотрудников",
@@ -600,7 +769,7 @@ class EmployeeDeleteView(generics.DestroyAPIView):
 
 class HouseListView(generics.ListAPIView):
     """Список всех жилых домов"""
-    queryset = House.objects.all()
+    queryset = House.objects.order_by('label')
     serializer_class = HouseLstCrtDelSerializer
     permission_classes = (IsSuperuser,)
 
@@ -628,6 +797,55 @@ class HouseListView(generics.ListAPIView):
         return super().get(request, *args, **kwargs)
 
 
+class HouseAutocompleteView(generics.ListAPIView):
+    """Поиск жилых домов по адресу (подсказки)"""
+    serializer_class = HouseAutocompleteSerializer
+    permission_classes = ((IsSuperuser | IsStaff),)
+    candidates_limit = 500
+
+    def get_queryset(self):
+        params = AutocompleteSerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        query = params.validated_data['q']
+
+        candidates = House.objects.all()
+        for word in query.split():
+            candidates = candidates.filter(label__icontains=word)
+
+        # Похожесть считается только для ограниченного числа совпадений, чтобы короткие
+        # и частые запросы не требовали сортировки всей таблицы
+        return House.objects.filter(
+            pk__in=candidates.values('pk')[:self.candidates_limit]
+        ).only('pk', 'label').annotate(
+            similarity=TrigramWordSimilarity(query, 'label')
+        ).order_by('-similarity', 'label')[:params.validated_data['limit']]
+
+    @extend_schema(
+        summary="Поиск жилых домов по адресу",
+        description="Подсказки для выбора жилого дома: дома, адрес которых содержит все слова запроса q "
+                    "(не менее 3 символов). Наиболее похожие адреса (среди первых 500 совпадений) идут первыми.",
+        parameters=[AutocompleteSerializer],
+        responses={
+            status.HTTP_200_OK: serializer_class(many=True),
+            status.HTTP_400_BAD_REQUEST: inline_serializer(
+                name="BadRequestResponse",
+                fields={"detail": serializers.CharField(default="Неверный запрос")}
+            ),
+            status.HTTP_401_UNAUTHORIZED: inline_serializer(
+                name="UnauthorizedResponse",
+                fields={"detail": serializers.CharField(default="Неавторизованный доступ")}
+            ),
+            status.HTTP_403_FORBIDDEN: inline_serializer(
+                name="ForbiddenResponse",
+                fields={"detail": serializers.CharField(default="Доступ запрещен")}
+            ),
+        },
+        tags=["house"]
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+
 class HouseCreateView(generics.CreateAPIView):
     """Добавление нового жилого дома"""
     queryset = House.objects.all()
@@ -691,11 +909,12 @@ class HouseDeleteView(generics.DestroyAPIView):
         return super().delete(request, *args, **kwargs)
 
 
-class OfficeListView(generics.ListAPIView):
+class OfficeListView(DataVersionConditionalMixin, generics.ListAPIView):
     """Список всех управляющих компаний"""
     queryset = Office.objects.all()
     serializer_class = OfficeLstCrtDelSerializer
     permission_classes = (IsSuperuser,)
+    etag_models = (Office,)
 
     @extend_schema(
         summary="Список всех управляющих компаний",
@@ -784,11 +1003,12 @@ class OfficeDeleteView(generics.DestroyAPIView):
         return super().delete(request, *args, **kwargs)
 
 
-class PositionListView(generics.ListAPIView):
+class PositionListView(DataVersionConditionalMixin, generics.ListAPIView):
     """Список всех должностей"""
     queryset = Position.objects.all()
     serializer_class = PositionLstCrtDelSerializer
     permission_classes = (IsSuperuser,)
+    etag_models = (Position,)
 
     @extend_schema(
         summary="Список всех должностей",
@@ -881,9 +1101,12 @@ class NewRequestsView(generics.ListAPIView):
     """Список заявок со статусом 'Новая'"""
     queryset = Request.objects.filter(
         status__pk=1
+    ).select_related(
+        'address__address__street'
     )
     serializer_class = RequestShortInfoSerializer
     permission_classes = ((IsSuperuser | IsStaff),)
+    pagination_class = CreatedAtCursorPagination
 
     @extend_schema(
         summary="Список всех заявок со статусом 'Новая'",
@@ -913,9 +1136,12 @@ class ActiveRequestsView(generics.ListAPIView):
     """Список заявок со статусом, относящимся к активным"""
     queryset = Request.objects.filter(
         status__pk__in=[2, 3]
+    ).select_related(
+        'address__address__street'
     )
     serializer_class = RequestShortInfoSerializer
     permission_classes = ((IsSuperuser | IsStaff),)
+    pagination_class = CreatedAtCursorPagination
 
     @extend_schema(
         summary="Список всех заявок со статусом, относящимся к активным",
@@ -943,7 +1169,12 @@ class ActiveRequestsView(generics.ListAPIView):
 
 class RequestDetailView(generics.RetrieveUpdateAPIView):
     """Полная информация о заявке"""
-    queryset = Request.objects.all()
+    queryset = Request.objects.select_related(
+        'address__complex',
+        'address__address__street',
+        'status',
+        'resident'
+    )
     serializer_class = RequestDetSerializer
     permission_classes = ((IsSuperuser | IsStaff),)
 
@@ -1019,6 +1250,61 @@ class RequestDetailView(generics.RetrieveUpdateAPIView):
         return super().put(request, *args, **kwargs)
 
 
+class RequestPhotoFileIdView(generics.UpdateAPIView):
+    """Сохранение file_id фото заявки в Telegram"""
+    queryset = Request.objects.all()
+    serializer_class = RequestPhotoFileIdSerializer
+    permission_classes = ((IsSuperuser | IsStaff),)
+
+    @extend_schema(
+        summary="Сохранение file_id фото заявки",
+        description="Сохранение file_id фото заявки, отправленного ботом сотрудников. Повторно фото отправляется по file_id, без загрузки файла. При замене фото сохранённый file_id сбрасывается.",
+        request=serializer_class,
+        responses={
+            status.HTTP_200_OK: serializer_class,
+            status.HTTP_400_BAD_REQUEST: inline_serializer(
+                name="BadRequestResponse",
+                fields={"detail": serializers.CharField(default="Неверный запрос")}
+            ),
+            status.HTTP_401_UNAUTHORIZED: inline_serializer(
+                name="UnauthorizedResponse",
+                fields={"detail": serializers.CharField(default="Неавторизованный доступ")}
+            ),
+            status.HTTP_403_FORBIDDEN: inline_serializer(
+                name="ForbiddenResponse",
+                fields={"detail": serializers.CharField(default="Доступ запрещен")}
+            ),
+        },
+        tags=["request"]
+    )
+    def put(self, request, *args, **kwargs):
+        return super().put(request, *args, **kwargs)
+
+    @extend_schema(
+        summary="Сохранение file_id фото заявки",
+        description="Сохранение file_id фото заявки, отправленного ботом сотрудников. Повторно фото отправляется по file_id, без загрузки файла. При замене фото сохранённый file_id сбрасывается.",
+        request=serializer_class,
+        responses={
+            status.HTTP_200_OK: serializer_class,
+            status.HTTP_400_BAD_REQUEST: inline_serializer(
+                name="BadRequestResponse",
+                fields={"detail": serializers.CharField(default="Неверный запрос")}
+            ),
+            status.HTTP_401_UNAUTHORIZED: inline_serializer(
+                name="UnauthorizedResponse",
+                fields={"detail": serializers.CharField(default="Неавторизованный доступ")}
+            ),
+            status.HTTP_403_FORBIDDEN: inline_serializer(
+                name="ForbiddenResponse",
+                fields={"detail": serializers.CharField(default="Доступ запрещен")}
+            ),
+        },
+        tags=["request"]
+    )
+    def patch(self, request, *args, **kwargs):
+        return super().patch(request, *args, **kwargs)
+
+
 class RequestTasksView(generics.ListAPIView):
     """Список задач для заявки"""
 
@@ -1055,6 +1341,120 @@ class RequestTasksView(generics.ListAPIView):
         return super().get(request, *args, **kwargs)
 
 
+class RequestExportView(generics.GenericAPIView):
+    """Выгрузка заявок с задачами"""
+    serializer_class = RequestExportSerializer
+    permission_classes = (IsSuperuser,)
+
+    @extend_schema(
+        summary="Выгрузка заявок с задачами",
+        description="Потоковая выгрузка заявок вместе с задачами, жителем, адресом и статусом в CSV или NDJSON "
+                    "(по строке на задачу). Поддерживаются фильтры по периоду создания, офису УК и статусам "
+                    "(status можно указать несколько раз), а также сжатие gzip.",
+        parameters=[serializer_class],
+        responses={
+            (status.HTTP_200_OK, 'text/csv'): OpenApiTypes.BINARY,
+            (status.HTTP_200_OK, 'application/x-ndjson'): OpenApiTypes.BINARY,
+            status.HTTP_400_BAD_REQUEST: inline_serializer(
+                name="BadRequestResponse",
+                fields={"detail": serializers.CharField(default="Неверный запрос")}
+            ),
+            status.HTTP_401_UNAUTHORIZED: inline_serializer(
+                name="UnauthorizedResponse",
+                fields={"detail": serializers.CharField(default="Неавторизованный доступ")}
+            ),
+            status.HTTP_403_FORBIDDEN: inline_serializer(
+                name="ForbiddenResponse",
+                fields={"detail": serializers.CharField(default="Доступ запрещен")}
+            ),
+        },
+        tags=["request"]
+    )
+    def get(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        queryset = get_export_queryset(
+            date_from=params.get('date_from'),
+            date_to=params.get('date_to'),
+            office=params.get('office'),
+            statuses=params.get('status'),
+        )
+        file_format = params['export_format']
+        filename = f'requests.{file_format}'
+
+        response = StreamingHttpResponse(
+            iter_export(queryset, file_format, compress=params['gzip']),
+            content_type='application/gzip' if params['gzip'] else CONTENT_TYPES[file_format]
+        )
+        if params['gzip']:
+            filename += '.gz'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class RequestSearchView(generics.GenericAPIView):
+    """Полнотекстовый поиск заявок"""
+    serializer_class = RequestSearchLstSerializer
+    permission_classes = ((IsSuperuser | IsStaff),)
+    candidates_limit = 1000
+
+    @extend_schema(
+        summary="Полнотекстовый поиск заявок",
+        description="Поиск заявок по словам из текста обращения (с учётом словоформ русского языка). "
+                    "Запрос q поддерживает синтаксис веб-поиска: фразы в кавычках, OR и исключение через минус. "
+                    "Результаты упорядочены по релевантности среди 1000 последних совпадений, "
+                    "затем по дате создания (сначала новые). "
+                    "Поддерживаются фильтры по статусам (status можно указать несколько раз), "
+                    "жилому комплексу и периоду создания.",
+        parameters=[RequestSearchSerializer],
+        responses={
+            status.HTTP_200_OK: serializer_class(many=True),
+            status.HTTP_400_BAD_REQUEST: inline_serializer(
+                name="BadRequestResponse",
+                fields={"detail": serializers.CharField(default="Неверный запрос")}
+            ),
+            status.HTTP_401_UNAUTHORIZED: inline_serializer(
+                name="UnauthorizedResponse",
+                fields={"detail": serializers.CharField(default="Неавторизованный доступ")}
+            ),
+            status.HTTP_403_FORBIDDEN: inline_serializer(
+                name="ForbiddenResponse",
+                fields={"detail": serializers.CharField(default="Доступ запрещен")}
+            ),
+        },
+        tags=["request"]
+    )
+    def get(self, request, *args, **kwargs):
+        params = RequestSearchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        params = params.validated_data
+
+        query = SearchQuery(params['q'], config='russian', search_type='websearch')
+        queryset = filter_by_created_date(
+            Request.objects.filter(search_vector=query),
+            params.get('date_from'),
+            params.get('date_to'),
+        )
+        if params.get('status'):
+            queryset = queryset.filter(status_id__in=params['status'])
+        if params.get('complex'):
+            queryset = queryset.filter(address__complex_id=params['complex'])
+
+        # Релевантность считается только для последних совпадений, чтобы частые слова
+        # не требовали ранжирования всей таблицы
+        candidates = queryset.order_by('-created_at', '-id').values('pk')[:self.candidates_limit]
+        queryset = Request.objects.filter(pk__in=candidates).annotate(
+            rank=SearchRank(F('search_vector'), query)
+        ).select_related(
+            'address__address__street', 'status'
+        ).order_by('-rank', '-created_at', '-id')[:params['limit']]
+
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
 class RequestCreateView(generics.CreateAPIView):
     """Добавление новой заявки"""
     queryset = Request.objects.all()
@@ -1090,10 +1490,16 @@ class UserRequestsView(generics.ListAPIView):
 
     serializer_class = RequestDetSerializer
     permission_classes = ((IsSuperuser | IsStaff),)
+    pagination_class = CreatedAtCursorPagination
 
     def get_queryset(self):
         return Request.objects.filter(
             resident__tg_id=self.kwargs.get('tgID')
+        ).select_related(
+            'address__complex',
+            'address__address__street',
+            'status',
+            'resident'
         )
 
     @extend_schema(
@@ -1125,6 +1531,7 @@ class ResidentListView(generics.ListAPIView):
     queryset = Resident.objects.all()
     serializer_class = ResidentLstSerializer
     permission_classes = ((IsSuperuser | IsStaff),)
+    pagination_class = IdCursorPagination
 
     @extend_schema(
         summary="Список жителей",
@@ -1150,6 +1557,55 @@ class ResidentListView(generics.ListAPIView):
         return super().get(request, *args, **kwargs)
 
 
+class ResidentAutocompleteView(generics.ListAPIView):
+    """Поиск жителей по фамилии, номеру телефона или tgID (подсказки)"""
+    serializer_class = ResidentAutocompleteSerializer
+    permission_classes = ((IsSuperuser | IsStaff),)
+    candidates_limit = 500
+
+    def get_queryset(self):
+        params = AutocompleteSerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+
+        query = params.validated_data['q']
+        queryset = Resident.objects.search(query)
+        words = [word for word in query.split() if not word.lstrip('+').isdigit()]
+        if not words:
+            return queryset.order_by('surname', 'name')[:params.validated_data['limit']]
+
+        return Resident.objects.filter(
+            pk__in=queryset.values('pk')[:self.candidates_limit]
+        ).annotate(
+            similarity=TrigramSimilarity('surname', words[0])
+        ).order_by('-similarity', 'surname', 'name')[:params.validated_data['limit']]
+
+    @extend_schema(
+        summary="Поиск жителей по фамилии, номеру телефона или tgID",
+        description="Подсказки для выбора жителя по запросу q (не менее 3 символов). "
+                    "Числа ищутся в номере телефона и tgID, первое слово - в фамилии, "
+                    "остальные слова - в начале имени или отчества.",
+        parameters=[AutocompleteSerializer],
+        responses={
+            status.HTTP_200_OK: serializer_class(many=True),
+            status.HTTP_400_BAD_REQUEST: inline_serializer(
+                name="BadRequestResponse",
+                fields={"detail": serializers.CharField(default="Неверный запрос")}
+            ),
+            status.HTTP_401_UNAUTHORIZED: inline_serializer(
+                name="UnauthorizedResponse",
+                fields={"detail": serializers.CharField(default="Неавторизованный доступ")}
+            ),
+            status.HTTP_403_FORBIDDEN: inline_serializer(
+                name="ForbiddenResponse",
+                fields={"detail": serializers.CharField(default="Доступ запрещен")}
+            ),
+        },
+        tags=["resident"]
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+
 class ResidentCreateView(generics.CreateAPIView):
     """Добавление нового жителя"""
     queryset = Resident.objects.all()
@@ -1221,7 +1677,9 @@ class ResidentByTgView(APIView):
 
 class WorkScheduleListView(generics.ListAPIView):
     """Список всех графиков работы"""
-    queryset = WorkSchedule.objects.all()
+    queryset = WorkSchedule.objects.prefetch_related(
+        Prefetch('work_days', queryset=WorkDay.objects.order_by('day_of_week'))
+    )
     serializer_class = WorkScheduleLstSerializer
     permission_classes = (IsSuperuser,)
 
@@ -1251,7 +1709,9 @@ class WorkScheduleListView(generics.ListAPIView):
 
 class WorkScheduleDetailView(generics.RetrieveAPIView):
     """Полная информация о графике работы"""
-    queryset = WorkSchedule.objects.all()
+    queryset = WorkSchedule.objects.prefetch_related(
+        Prefetch('work_days', queryset=WorkDay.objects.order_by('day_of_week'))
+    )
     serializer_class = WorkScheduleDetMngSerializer
     permission_classes = (IsSuperuser,)
 
@@ -1387,6 +1847,147 @@ class WorkScheduleCreateView(generics.CreateAPIView):
         return super().post(request, *args, **kwargs)
 
 
+class WorkScheduleWeekCreateView(generics.CreateAPIView):
+    """Добавление нового графика работы вместе с днями недели"""
+    queryset = WorkSchedule.objects.all()
+    serializer_class = WorkScheduleWeekSerializer
+    permission_classes = (IsSuperuser,)
+
+    @extend_schema(
+        summary="Добавление нового графика работы вместе с днями недели",
+        description="Добавление нового графика работы и всех его дней недели за один запрос. "
+                    "Дни, не указанные в work_days, создаются нерабочими.",
+        request=serializer_class,
+        responses={
+            status.HTTP_201_CREATED: WorkScheduleDetMngSerializer,
+            status.HTTP_400_BAD_REQUEST: inline_serializer(
+                name="BadRequestResponse",
+                fields={"detail": serializers.CharField(default="Неверный запрос")}
+            ),
+            status.HTTP_401_UNAUTHORIZED: inline_serializer(
+                name="UnauthorizedResponse",
+                fields={"detail": serializers.CharField(default="Неавторизованный доступ")}
+            ),
+            status.HTTP_403_FORBIDDEN: inline_serializer(
+                name="ForbiddenResponse",
+                fields={"detail": serializers.CharField(default="Доступ запрещен")}
+            ),
+        },
+        tags=["schedule"]
+    )
+    def post(self, request, *args, **kwargs):
+        return super().post(request, *args, **kwargs)
+
+
+class WorkScheduleWeekManageView(generics.UpdateAPIView):
+    """Изменение графика работы вместе с днями недели"""
+    queryset = WorkSchedule.objects.all()
+    serializer_class = WorkScheduleWeekSerializer
+    permission_classes = (IsSuperuser,)
+
+    @extend_schema(
+        summary="Замена всех дней недели графика работы",
+        description="Замена названия и всех дней недели графика работы за один запрос. "
+                    "Дни, не указанные в work_days, становятся нерабочими.",
+        request=serializer_class,
+        responses={
+            status.HTTP_200_OK: WorkScheduleDetMngSerializer,
+            status.HTTP_400_BAD_REQUEST: inline_serializer(
+                name="BadRequestResponse",
+                fields={"detail": serializers.CharField(default="Неверный запрос")}
+            ),
+            status.HTTP_401_UNAUTHORIZED: inline_serializer(
+                name="UnauthorizedResponse",
+                fields={"detail": serializers.CharField(default="Неавторизованный доступ")}
+            ),
+            status.HTTP_403_FORBIDDEN: inline_serializer(
+                name="ForbiddenResponse",
+                fields={"detail": serializers.CharField(default="Доступ запрещен")}
+            ),
+        },
+        tags=["schedule"]
+    )
+    def put(self, request, *args, **kwargs):
+        return super().put(request, *args, **kwargs)
+
+    @extend_schema(
+        summary="Изменение графика работы",
+        description="Изменение названия и/или дней недели графика работы за один запрос. "
+                    "Если передан work_days, дни, не указанные в нём, становятся нерабочими.",
+        request=serializer_class,
+        responses={
+            status.HTTP_200_OK: WorkScheduleDetMngSerializer,
+            status.HTTP_400_BAD_REQUEST: inline_serializer(
+                name="BadRequestResponse",
+                fields={"detail": serializers.CharField(default="Неверный запрос")}
+            ),
+            status.HTTP_401_UNAUTHORIZED: inline_serializer(
+                name="UnauthorizedResponse",
+                fields={"detail": serializers.CharField(default="Неавторизованный доступ")}
+            ),
+            status.HTTP_403_FORBIDDEN: inline_serializer(
+                name="ForbiddenResponse",
+                fields={"detail": serializers.CharField(default="Доступ запрещен")}
+            ),
+        },
+        tags=["schedule"]
+    )
+    def patch(self, request, *args, **kwargs):
+        return super().patch(request, *args, **kwargs)
+
+
+class WorkScheduleCloneView(generics.GenericAPIView):
+    """Копирование графика работы"""
+    queryset = WorkSchedule.objects.prefetch_related('work_days')
+    serializer_class = WorkScheduleCloneSerializer
+    permission_classes = (IsSuperuser,)
+
+    @extend_schema(
+        summary="Копирование графика работы",
+        description="Создание копии графика работы вместе со всеми днями недели. "
+                    "Если название не передано, используется название исходного графика с пометкой '(копия)'.",
+        request=serializer_class,
+        responses={
+            status.HTTP_201_CREATED: WorkScheduleDetMngSerializer,
+            status.HTTP_400_BAD_REQUEST: inline_serializer(
+                name="BadRequestResponse",
+                fields={"detail": serializers.CharField(default="Неверный запрос")}
+            ),
+            status.HTTP_401_UNAUTHORIZED: inline_serializer(
+                name="UnauthorizedResponse",
+                fields={"detail": serializers.CharField(default="Неавторизованный доступ")}
+            ),
+            status.HTTP_403_FORBIDDEN: inline_serializer(
+                name="ForbiddenResponse",
+                fields={"detail": serializers.CharField(default="Доступ запрещен")}
+            ),
+            status.HTTP_404_NOT_FOUND: inline_serializer(
+                name="NotFoundResponse",
+                fields={"detail": serializers.CharField(default="Страница не найдена")}
+            ),
+        },
+        tags=["schedule"]
+    )
+    def post(self, request, *args, **kwargs):
+        source = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        schedule = WorkSchedule(name=serializer.validated_data.get('name') or f'{source.name} (копия)'[:100])
+        schedule.work_week = {
+            work_day.day_of_week: {
+                'is_not_working': work_day.is_not_working,
+                'start_time': work_day.start_time,
+                'end_time': work_day.end_time,
+            }
+            for work_day in source.work_days.all()
+        }
+        with transaction.atomic():
+            schedule.save()
+
+        return Response(WorkScheduleWeekSerializer(schedule).data, status=status.HTTP_201_CREATED)
+
+
 class WorkScheduleDeleteView(generics.DestroyAPIView):
     """Удаление графика работы"""
     queryset = WorkSchedule.objects.all()
@@ -1450,12 +2051,13 @@ class StreetCreateView(generics.CreateAPIView):
         return super().post(request, *args, **kwargs)
 
 
-class ServiceListView(generics.ListAPIView):
+class ServiceListView(DataVersionConditionalMixin, generics.ListAPIView):
     """Список всех типовых задач"""
 
     queryset = Service.objects.all()
     serializer_class = ServiceLstCrtDelSerializer
     permission_classes = ((IsSuperuser | IsStaff),)
+    etag_models = (Service,)
 
     @extend_schema(
         summary="Список типовых задач",
@@ -1728,6 +2330,7 @@ class TasksForMasterView(generics.ListAPIView):
 
     serializer_class = RequestTaskInfoSerializer
     permission_classes = ((IsSuperuser | IsStaff),)
+    pagination_class = IdCursorPagination
 
     def get_queryset(self):
         return RequestTask.objects.filter(
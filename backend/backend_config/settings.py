@@ -51,6 +51,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'drf_spectacular',
 
     'rest_framework',
@@ -104,6 +105,27 @@ DATABASES = {
     }
 }
 
+# Общий кэш процессов (Redis) задаётся переменной REDIS_URL, без неё используется кэш в памяти процесса
+REDIS_URL = os.environ.get("REDIS_URL")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Время жизни кэша токенов API в общем кэше и в памяти процесса (api_v1.authentication), секунды.
+# Без REDIS_URL общего кэша нет, и токены не кэшируются (выход из системы должен сразу действовать во всех процессах)
+AUTH_TOKEN_CACHE_TIMEOUT = int(os.environ.get("AUTH_TOKEN_CACHE_TIMEOUT", default=60))
+AUTH_TOKEN_LOCAL_CACHE_TIMEOUT = int(os.environ.get("AUTH_TOKEN_LOCAL_CACHE_TIMEOUT", default=5))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -143,7 +165,7 @@ DJOSER = {
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'api_v1.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly'
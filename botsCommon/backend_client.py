@@ -0,0 +1,183 @@
+import asyncio
+import json
+import os
+import random
+
+import aiohttp
+
+
+BACKEND_CONNECTIONS_LIMIT = int(os.environ.get(
+    "BACKEND_CONNECTIONS_LIMIT",
+    default='20'
+))
+
+BACKEND_TIMEOUT = float(os.environ.get(
+    "BACKEND_TIMEOUT",
+    default='10'
+))
+
+BACKEND_RETRIES_COUNT = int(os.environ.get(
+    "BACKEND_RETRIES_COUNT",
+    default='3'
+))
+
+BACKEND_RETRIES_DELAY = float(os.environ.get(
+    "BACKEND_RETRIES_DELAY",
+    default='0.5'
+))
+
+# Запросы, которые можно безопасно повторить после ошибки соединения или таймаута
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+RETRY_STATUSES = (502, 503, 504)
+
+
+class BackendError(Exception):
+    def __init__(self, message, status=None, data=None):
+        super().__init__(message)
+        self.status = status
+        self.data = data
+
+
+class BackendClient:
+    """
+    Асинхронный клиент API бэкенда для ботов: одна сессия aiohttp с пулом соединений на процесс,
+    общий для всех корутин токен API (обновляется при ответе 401), таймауты запросов,
+    повторы с экспоненциальной задержкой и джиттером, однократный разбор JSON
+    """
+
+    def __init__(self, base_url, username, password, api_token=None,
+                 connections_limit=BACKEND_CONNECTIONS_LIMIT, timeout=BACKEND_TIMEOUT,
+                 retries=BACKEND_RETRIES_COUNT, retries_delay=BACKEND_RETRIES_DELAY):
+        self.base_url = base_url.rstrip('/')
+        self.username = username
+        self.password = password
+        # Постоянный токен сервисной учётной записи (python manage.py issue_bot_token).
+        # Если он не задан, токен один раз получается входом по логину и паролю
+        self.token = api_token or None
+        self.connections_limit = connections_limit
+        self.timeout = timeout
+        self.retries = retries
+        self.retries_delay = retries_delay
+        self.session = None
+        self.token_lock = asyncio.Lock()
+
+    def get_session(self):
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.connections_limit, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self.session
+
+    async def close(self):
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+
+    def url(self, path):
+        if path.startswith('http://') or path.startswith('https://'):
+            return path
+        return f'{self.base_url}{path}'
+
+    async def get_token(self, expired_token=None):
+        """
+        Текущий токен API. Вход выполняется, только если токена ещё нет или он отклонён бэкендом,
+        причём при одновременном отказе токен обновляет только одна корутина
+        """
+
+        async with self.token_lock:
+            if self.token is None or self.token == expired_token:
+                data = await self.request('POST', '/auth/token/login', auth=False, data={
+                    'username': self.username,
+                    'password': self.password,
+                })
+                self.token = data.get('auth_token') if isinstance(data, dict) else None
+            return self.token
+
+    async def request(self, method, path, *, params=None, data=None, timeout=None, auth=True, retry=None):
+        """
+        Запрос к API. Возвращает разобранный JSON (None для пустого ответа),
+        при ошибке соединения или статусе ответа не 2xx вызывает BackendError.
+        data может быть функцией, создающей тело запроса заново для каждой попытки (например, FormData).
+        Повторяются только идемпотентные запросы, если явно не передан retry=True
+        """
+
+        method = method.upper()
+        if retry is None:
+            retry = method in IDEMPOTENT_METHODS
+        attempts = self.retries + 1 if retry else 1
+        request_timeout = aiohttp.ClientTimeout(total=timeout) if timeout else None
+
+        token = await self.get_token() if auth else None
+        token_refreshed = False
+        attempt = 0
+        while True:
+            headers = {'Authorization': f'Token {token}'} if token else {}
+            try:
+                async with self.get_session().request(
+                        method,
+                        self.url(path),
+                        params=params,
+                        data=data() if callable(data) else data,
+                        headers=headers,
+                        timeout=request_timeout,
+                ) as response:
+                    status = response.status
+                    body = await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                attempt += 1
+                if attempt >= attempts:
+                    raise BackendError(f'{method} {path}: {e!r}') from e
+                await self.sleep_before_retry(attempt)
+                continue
+
+            if status == 401 and auth and not token_refreshed:
+                token = await self.get_token(expired_token=token)
+                token_refreshed = True
+                continue
+            if status in RETRY_STATUSES and attempt + 1 < attempts:
+                attempt += 1
+                await self.sleep_before_retry(attempt)
+                continue
+
+            payload = self.decode(body)
+            if status >= 400:
+                raise BackendError(f'{method} {path}: status {status}', status=status, data=payload)
+            return payload
+
+    async def read(self, path, timeout=None):
+        """
+        Загрузка файла (например, фото заявки) без авторизации и разбора ответа
+        """
+
+        try:
+            async with self.get_session().get(
+                    self.url(path),
+                    timeout=aiohttp.ClientTimeout(total=timeout) if timeout else None
+            ) as response:
+                if response.status != 200:
+                    raise BackendError(f'GET {path}: status {response.status}', status=response.status)
+                return await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise BackendError(f'GET {path}: {e!r}') from e
+
+    async def get(self, path, **kwargs):
+        return await self.request('GET', path, **kwargs)
+
+    async def post(self, path, **kwargs):
+        return await self.request('POST', path, **kwargs)
+
+    async def patch(self, path, **kwargs):
+        return await self.request('PATCH', path, **kwargs)
+
+    async def sleep_before_retry(self, attempt):
+        # Полный джиттер: случайная задержка до удвоенной с каждой попыткой
+        await asyncio.sleep(random.uniform(0, self.retries_delay * 2 ** (attempt - 1)))
+
+    @staticmethod
+    def decode(body):
+        if not body:
+            return None
+        try:
+            return json.loads(body)
+        except ValueError:
+            return body.decode(errors='replace')
@@ -0,0 +1,207 @@
+import asyncio
+import json
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+from aiogram import BaseMiddleware
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage
+from aiogram.fsm.storage.memory import MemoryStorage, SimpleEventIsolation
+
+
+# Хранилище состояний диалогов: memory (в памяти процесса), sqlite или redis
+FSM_STORAGE = str(os.environ.get(
+    "FSM_STORAGE",
+    default='memory'
+))
+
+FSM_SQLITE_PATH = str(os.environ.get(
+    "FSM_SQLITE_PATH",
+    default='fsm.sqlite3'
+))
+
+# Адрес сервера с протоколом Redis (Redis, Valkey, KeyDB и т.п.)
+FSM_REDIS_URL = str(os.environ.get(
+    "FSM_REDIS_URL",
+    default='redis://localhost:6379/0'
+))
+
+
+def storage_key_id(key):
+    return f'{key.bot_id}:{key.chat_id}:{key.user_id}:{key.thread_id or ""}:{key.destiny}'
+
+
+class SQLiteStorage(BaseStorage):
+    """
+    Хранилище состояний диалогов в SQLite. Состояние и данные пользователя хранятся одной строкой,
+    запросы выполняются последовательно в отдельном потоке, чтобы не блокировать цикл событий.
+    Файл базы (режим WAL) может использоваться несколькими процессами бота на одном сервере
+    """
+
+    def __init__(self, path):
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='fsm_sqlite')
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS fsm (key TEXT PRIMARY KEY, state TEXT, data TEXT NOT NULL)'
+        )
+
+    async def run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    def _get(self, key_id):
+        row = self.connection.execute('SELECT state, data FROM fsm WHERE key = ?', (key_id,)).fetchone()
+        if row is None:
+            return None, {}
+        return row[0], json.loads(row[1])
+
+    def _set(self, key_id, state, data):
+        if state is None and not data:
+            self.connection.execute('DELETE FROM fsm WHERE key = ?', (key_id,))
+            return
+        self.connection.execute(
+            'INSERT INTO fsm (key, state, data) VALUES (?, ?, ?) '
+            'ON CONFLICT (key) DO UPDATE SET state = excluded.state, data = excluded.data',
+            (key_id, state, json.dumps(data, ensure_ascii=False))
+        )
+
+    def _set_state(self, key_id, state):
+        current_state, data = self._get(key_id)
+        self._set(key_id, state, data)
+
+    def _set_data(self, key_id, data):
+        state, current_data = self._get(key_id)
+        self._set(key_id, state, data)
+
+    async def get_state_and_data(self, key):
+        return await self.run(self._get, storage_key_id(key))
+
+    async def set_state_and_data(self, key, state, data):
+        await self.run(self._set, storage_key_id(key), state, data)
+
+    async def set_state(self, key, state=None):
+        await self.run(self._set_state, storage_key_id(key), state.state if isinstance(state, State) else state)
+
+    async def get_state(self, key):
+        state, data = await self.get_state_and_data(key)
+        return state
+
+    async def set_data(self, key, data):
+        await self.run(self._set_data, storage_key_id(key), data)
+
+    async def get_data(self, key):
+        state, data = await self.get_state_and_data(key)
+        return data
+
+    async def close(self):
+        await self.run(self.connection.close)
+        self.executor.shutdown(wait=False)
+
+
+class BufferedFSMContext(FSMContext):
+    """
+    Контекст состояния, который читает состояние и данные пользователя один раз за обработку
+    обновления, а все изменения (несколько update_data в обработчике) записывает одним запросом
+    """
+
+    def __init__(self, storage, key):
+        super().__init__(storage=storage, key=key)
+        self.loaded = False
+        self.changed = False
+        self.state = None
+        self.data = {}
+
+    async def load(self):
+        if self.loaded:
+            return
+        if hasattr(self.storage, 'get_state_and_data'):
+            self.state, self.data = await self.storage.get_state_and_data(self.key)
+        else:
+            self.state = await self.storage.get_state(self.key)
+            self.data = await self.storage.get_data(self.key)
+        self.loaded = True
+
+    async def set_state(self, state=None):
+        await self.load()
+        self.state = state.state if isinstance(state, State) else state
+        self.changed = True
+
+    async def get_state(self):
+        await self.load()
+        return self.state
+
+    async def set_data(self, data):
+        await self.load()
+        self.data = dict(data)
+        self.changed = True
+
+    async def get_data(self):
+        await self.load()
+        return dict(self.data)
+
+    async def update_data(self, data=None, **kwargs):
+        if data:
+            kwargs.update(data)
+        await self.load()
+        self.data.update(kwargs)
+        self.changed = True
+        return dict(self.data)
+
+    async def flush(self):
+        if not self.changed:
+            return
+        if hasattr(self.storage, 'set_state_and_data'):
+            await self.storage.set_state_and_data(self.key, self.state, self.data)
+        else:
+            await self.storage.set_state(self.key, self.state)
+            await self.storage.set_data(self.key, self.data)
+        self.changed = False
+
+
+class BufferedFSMMiddleware(BaseMiddleware):
+    """
+    Подменяет контекст состояния обработчика на BufferedFSMContext и сохраняет изменения
+    после завершения обработки обновления.
+    Регистрируется как outer-middleware обновлений: dp.update.outer_middleware(BufferedFSMMiddleware()).
+    Диспетчер должен создаваться с events_isolation из create_events_isolation: иначе обновления одного
+    пользователя обрабатываются параллельно, и последнее из них перезапишет изменения остальных
+    """
+
+    async def __call__(self, handler, event, data):
+        state = data.get('state')
+        if state is None:
+            return await handler(event, data)
+
+        buffered_state = BufferedFSMContext(storage=state.storage, key=state.key)
+        data['state'] = buffered_state
+        try:
+            return await handler(event, data)
+        finally:
+            await buffered_state.flush()
+
+
+def create_fsm_storage(storage_type=FSM_STORAGE):
+    if storage_type == 'memory':
+        return MemoryStorage()
+    if storage_type == 'sqlite':
+        return SQLiteStorage(FSM_SQLITE_PATH)
+    if storage_type == 'redis':
+        # Пакет redis нужен только для этого варианта хранилища
+        from aiogram.fsm.storage.redis import RedisStorage
+        return RedisStorage.from_url(FSM_REDIS_URL)
+    raise ValueError(f'Unknown FSM storage "{storage_type}". Use memory, sqlite or redis')
+
+
+def create_events_isolation(storage):
+    """
+    Блокировка обработки обновлений одного пользователя на время обработчика (вместе с записью
+    изменений BufferedFSMContext). Для redis - общая для всех процессов, для остальных хранилищ - в процессе:
+    при нескольких процессах (BOT_WORKERS) обновления одного чата и так обрабатываются одним процессом
+    """
+
+    if hasattr(storage, 'create_isolation'):
+        return storage.create_isolation()
+    return SimpleEventIsolation()
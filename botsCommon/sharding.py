@@ -0,0 +1,263 @@
+import asyncio
+import collections
+import json
+import logging
+import multiprocessing
+import os
+import secrets
+import signal
+import sys
+from contextlib import suppress
+
+from aiohttp import web
+from aiogram import Bot
+from aiogram.exceptions import TelegramRetryAfter
+
+from botsCommon.webhook import (WEBHOOK_BASE_URL, WEBHOOK_HOST, WEBHOOK_PORT, create_bot_session,
+                                wait_for_stop_signal)
+
+
+# Количество процессов-обработчиков обновлений. При значении 1 бот работает одним процессом
+BOT_WORKERS = int(os.environ.get(
+    "BOT_WORKERS",
+    default='1'
+))
+
+# Сколько обновлений разных чатов один процесс обрабатывает одновременно
+BOT_WORKER_CONCURRENCY = int(os.environ.get(
+    "BOT_WORKER_CONCURRENCY",
+    default='100'
+))
+
+# Файл с обновлениями Telegram (по одному JSON-объекту в строке) вместо polling/webhook - для локальной проверки
+BOT_UPDATES_FILE = os.environ.get("BOT_UPDATES_FILE") or None
+
+POLLING_TIMEOUT = 30
+POLLING_MIN_DELAY = 1
+POLLING_MAX_DELAY = 60
+
+
+def update_chat_id(update):
+    """
+    Чат, к которому относится обновление Telegram (словарь в формате Bot API).
+    Для обновлений без чата используется пользователь, для остальных - 0
+    """
+
+    for update_type, event in update.items():
+        if not isinstance(event, dict):
+            continue
+        for source in (event, event.get('message')):
+            if isinstance(source, dict) and isinstance(source.get('chat'), dict):
+                return source['chat']['id']
+        user = event.get('from') or event.get('user')
+        if isinstance(user, dict):
+            return user['id']
+    return 0
+
+
+class ChatQueues:
+    """
+    Очереди обновлений по чатам внутри процесса-обработчика: обновления одного чата
+    обрабатываются строго по порядку, разных чатов - параллельно (не более concurrency одновременно)
+    """
+
+    def __init__(self, handle, concurrency):
+        self.handle = handle
+        self.queues = {}
+        self.tasks = set()
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+    def put(self, update):
+        chat_id = update_chat_id(update)
+        queue = self.queues.get(chat_id)
+        if queue is None:
+            queue = self.queues[chat_id] = collections.deque()
+            task = asyncio.create_task(self.consume(chat_id, queue))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+        queue.append(update)
+
+    async def consume(self, chat_id, queue):
+        try:
+            while queue:
+                update = queue.popleft()
+                async with self.semaphore:
+                    try:
+                        await self.handle(update)
+                    except Exception as e:
+                        print(f"Update {update.get('update_id')} handling error: {e}")
+        finally:
+            del self.queues[chat_id]
+
+    async def join(self):
+        while self.tasks:
+            await asyncio.gather(*self.tasks)
+
+
+async def work(index, token, dispatcher_factory, updates):
+    dp = dispatcher_factory()
+    bot = Bot(token=token, session=create_bot_session())
+    workflow_data = {'dispatcher': dp, 'bots': [bot], **dp.workflow_data}
+
+    async def handle(update):
+        await dp.feed_raw_update(bot, update)
+
+    chat_queues = ChatQueues(handle, BOT_WORKER_CONCURRENCY)
+    loop = asyncio.get_running_loop()
+
+    await dp.emit_startup(bot=bot, **workflow_data)
+    print(f"Bot worker {index} is started")
+    try:
+        while True:
+            update = await loop.run_in_executor(None, updates.get)
+            if update is None:
+                break
+            chat_queues.put(update)
+        await chat_queues.join()
+    finally:
+        try:
+            await dp.emit_shutdown(bot=bot, **workflow_data)
+        finally:
+            await bot.session.close()
+        print(f"Bot worker {index} is stopped")
+
+
+def run_worker(index, token, dispatcher_factory, updates):
+    # Останавливает обработчики главный процесс (через очередь), после того как перестал получать обновления
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logging.basicConfig(level=logging.INFO, stream=sys.stdout)
+    asyncio.run(work(index, token, dispatcher_factory, updates))
+
+
+async def read_updates_file(path, dispatch):
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            if line.strip():
+                dispatch(json.loads(line))
+    print(f"All updates from {path} are dispatched")
+
+
+async def poll_updates(bot, allowed_updates, dispatch):
+    """
+    Long polling через getUpdates. Полученные обновления подтверждаются смещением offset
+    при следующем запросе; при ошибках запрос повторяется с растущей задержкой
+    """
+
+    webhook_deleted = False
+    offset = None
+    delay = POLLING_MIN_DELAY
+    while True:
+        try:
+            if not webhook_deleted:
+                await bot.delete_webhook()
+                webhook_deleted = True
+            updates = await bot.get_updates(
+                offset=offset,
+                timeout=POLLING_TIMEOUT,
+                allowed_updates=allowed_updates,
+                # Ответ на long polling приходит не раньше, чем через POLLING_TIMEOUT
+                request_timeout=int(POLLING_TIMEOUT + bot.session.timeout),
+            )
+        except TelegramRetryAfter as e:
+            print(f"Polling error: {e}. Retry in {e.retry_after} s")
+            await asyncio.sleep(e.retry_after)
+            continue
+        except Exception as e:
+            print(f"Polling error: {e}. Retry in {delay} s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, POLLING_MAX_DELAY)
+            continue
+
+        delay = POLLING_MIN_DELAY
+        for update in updates:
+            dispatch(update.model_dump(mode='json', by_alias=True, exclude_unset=True))
+            offset = update.update_id + 1
+
+
+async def receive_webhook_updates(bot, allowed_updates, dispatch, path, secret=None):
+    secret = secret or secrets.token_urlsafe(32)
+
+    async def handle(request):
+        if not secrets.compare_digest(request.headers.get('X-Telegram-Bot-Api-Secret-Token', ''), secret):
+            return web.Response(status=401, text='Unauthorized')
+        dispatch(await request.json())
+        return web.json_response({})
+
+    app = web.Application()
+    app.router.add_post(path, handle)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, WEBHOOK_HOST, WEBHOOK_PORT).start()
+        await bot.set_webhook(
+            url=f'{WEBHOOK_BASE_URL}{path}',
+            secret_token=secret,
+            allowed_updates=allowed_updates,
+        )
+        print(f"Webhook is listening on {WEBHOOK_HOST}:{WEBHOOK_PORT}{path}")
+        await asyncio.Future()
+    finally:
+        await runner.cleanup()
+
+
+async def watch_workers(processes):
+    while True:
+        for process in processes:
+            if not process.is_alive():
+                raise RuntimeError(f"{process.name} exited with code {process.exitcode}")
+        await asyncio.sleep(1)
+
+
+async def run_sharded(dispatcher_factory, bot, allowed_updates, path, secret=None, workers=BOT_WORKERS):
+    """
+    Обработка обновлений несколькими процессами. Главный процесс только получает обновления
+    (из файла BOT_UPDATES_FILE, через webhook или polling) и передаёт каждое процессу-обработчику
+    по номеру чата, поэтому обновления одного пользователя всегда обрабатываются одним процессом по порядку.
+    В каждом процессе dispatcher_factory создаёт свой диспетчер; общее состояние диалогов
+    хранится в хранилище FSM (sqlite или redis)
+    """
+
+    context = multiprocessing.get_context('spawn')
+    queues = [context.Queue() for _ in range(workers)]
+    processes = [
+        context.Process(
+            target=run_worker,
+            args=(index, bot.token, dispatcher_factory, queues[index]),
+            name=f'Bot worker {index}',
+        )
+        for index in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    def dispatch(update):
+        queues[update_chat_id(update) % workers].put(update)
+
+    if BOT_UPDATES_FILE:
+        source = read_updates_file(BOT_UPDATES_FILE, dispatch)
+    elif WEBHOOK_BASE_URL:
+        source = receive_webhook_updates(bot, allowed_updates, dispatch, path, secret)
+    else:
+        source = poll_updates(bot, allowed_updates, dispatch)
+
+    tasks = [
+        asyncio.create_task(source),
+        asyncio.create_task(wait_for_stop_signal()),
+        asyncio.create_task(watch_workers(processes)),
+    ]
+    try:
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+        await asyncio.gather(*done)
+    finally:
+        # Обработчики завершают уже полученные обновления и останавливаются
+        for updates in queues:
+            updates.put(None)
+        loop = asyncio.get_running_loop()
+        for process in processes:
+            await loop.run_in_executor(None, process.join)
+        await bot.session.close()
@@ -0,0 +1,76 @@
+import asyncio
+import os
+import secrets
+import signal
+
+from aiohttp import web
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+
+
+# Внешний адрес nginx (например, https://dd.example.com). Если он не задан, бот работает в режиме polling
+WEBHOOK_BASE_URL = (os.environ.get("WEBHOOK_BASE_URL") or '').rstrip('/') or None
+
+WEBHOOK_HOST = str(os.environ.get(
+    "WEBHOOK_HOST",
+    default='0.0.0.0'
+))
+
+WEBHOOK_PORT = int(os.environ.get(
+    "WEBHOOK_PORT",
+    default='8080'
+))
+
+# Адрес сервера Bot API. Позволяет запускать бота с локальным Bot API или поддельным сервером Telegram
+TELEGRAM_API_URL = os.environ.get("TELEGRAM_API_URL") or None
+
+
+def create_bot_session():
+    if TELEGRAM_API_URL:
+        return AiohttpSession(api=TelegramAPIServer.from_base(TELEGRAM_API_URL))
+    return None
+
+
+async def wait_for_stop_signal():
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for stop_signal in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(stop_signal, stop_event.set)
+    await stop_event.wait()
+
+
+async def run_polling(dp, bot):
+    # Polling не работает, пока у бота установлен webhook
+    await bot.delete_webhook()
+    await dp.start_polling(bot)
+
+
+async def run_webhook(dp, bot, path, secret=None):
+    """
+    Приём обновлений через webhook на aiohttp-сервере (WEBHOOK_HOST:WEBHOOK_PORT).
+    Telegram передаёт secret в заголовке X-Telegram-Bot-Api-Secret-Token, обновления
+    с другим значением отклоняются. Если secret не задан, он генерируется при каждом запуске
+    """
+
+    secret = secret or secrets.token_urlsafe(32)
+
+    app = web.Application()
+    SimpleRequestHandler(dispatcher=dp, bot=bot, secret_token=secret).register(app, path=path)
+    setup_application(app, dp, bot=bot)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, WEBHOOK_HOST, WEBHOOK_PORT).start()
+        await bot.set_webhook(
+            url=f'{WEBHOOK_BASE_URL}{path}',
+            secret_token=secret,
+            allowed_updates=dp.resolve_used_update_types(),
+        )
+        print(f"Webhook is listening on {WEBHOOK_HOST}:{WEBHOOK_PORT}{path}")
+
+        # Как и при polling, SIGTERM/SIGINT завершают работу штатно (с остановкой диспетчера)
+        await wait_for_stop_signal()
+    finally:
+        await runner.cleanup()
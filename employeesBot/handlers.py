@@ -1,15 +1,13 @@
-import os
 from aiogram import F, Router
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.filters import CommandStart
-from aiogram.types import Message, CallbackQuery, FSInputFile
+from aiogram.types import Message, CallbackQuery, URLInputFile
 
 import keyboards as kbs
 import messages as msg
 import backend_connection as bc
-from utils import ensure_download_directory
 
 router = Router()
-DOWNLOAD_DIR = './EmployeesBot/downloads'
 
 
 @router.message(CommandStart())
@@ -89,15 +87,28 @@ async def open_request(callback: CallbackQuery):
             reply_markup=await kbs.request_info_keyboard(task_id)
         )
     else:
-        ensure_download_directory(DOWNLOAD_DIR)
-        local_photo_path = str(await bc.download_photo(request_info['photo'], DOWNLOAD_DIR))
-
-        await callback.message.answer_photo(
-            photo=FSInputFile(local_photo_path),
-            caption=await msg.request_info_message(request_info),
-            reply_markup=await kbs.request_info_keyboard(task_id)
-        )
-
-        os.remove(local_photo_path)
+        caption = await msg.request_info_message(request_info)
+        reply_markup = await kbs.request_info_keyboard(task_id)
+
+        photo_message = None
+        if request_info.get('photo_file_id'):
+            try:
+                photo_message = await callback.message.answer_photo(
+                    photo=request_info['photo_file_id'],
+                    caption=caption,
+                    reply_markup=reply_markup
+                )
+            except TelegramBadRequest as e:
+                # file_id недействителен (например, сменился токен бота) - фото отправляется заново
+                print(f"Photo file_id error: {e}. Request: {request_id}")
+
+        if photo_message is None:
+            # Первая отправка: фото передаётся из бэкенда в Telegram потоком, без сохранения на диск
+            photo_message = await callback.message.answer_photo(
+                photo=URLInputFile(request_info['photo'], filename=f'request_{request_id}.jpg'),
+                caption=caption,
+                reply_markup=reply_markup
+            )
+            await bc.save_photo_file_id(request_id, photo_message.photo[-1].file_id)
 
     await callback.message.delete()
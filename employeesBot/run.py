@@ -7,11 +7,23 @@ from aiogram import Bot, Dispatcher
 from aiogram.utils.token import TokenValidationError
 
 from handlers import router
-from backend_connection import get_bot_token
+from backend_connection import client, get_bot_token
+from botsCommon.sharding import BOT_WORKERS, run_sharded
+from botsCommon.webhook import WEBHOOK_BASE_URL, create_bot_session, run_polling, run_webhook
 from exceptions import StartBotException
 
 
-dp = Dispatcher()
+def create_dispatcher():
+    """
+    Диспетчер бота. При запуске с несколькими процессами (BOT_WORKERS) создаётся в каждом из них
+    """
+
+    dp = Dispatcher()
+    # Пул соединений с бэкендом закрывается при остановке бота
+    dp.shutdown.register(client.close)
+    dp.include_router(router=router)
+    return dp
+
 
 CONNECTION_ATTEMPTS_COUNT = int(os.environ.get(
     "CONNECTION_ATTEMPTS_COUNT",
@@ -33,15 +45,34 @@ CONNECTION_CYCLES_DELAY = float(os.environ.get(
     default='60'
 ))
 
+WEBHOOK_PATH = str(os.environ.get(
+    "EMPL_WEBHOOK_PATH",
+    default='/bot/employees'
+))
+
+WEBHOOK_SECRET = os.environ.get("EMPL_WEBHOOK_SECRET") or None
+
 
 async def main():
     for cycle in range(CONNECTION_CYCLES_COUNT):
         for attempt in range(CONNECTION_ATTEMPTS_COUNT):
             try:
                 bot_token = str(await get_bot_token())
-                bot = Bot(token=bot_token)
-                dp.include_router(router=router)
-                await dp.start_polling(bot)
+                bot = Bot(token=bot_token, session=create_bot_session())
+                if BOT_WORKERS > 1:
+                    # Главный процесс только распределяет обновления, с бэкендом работают процессы-обработчики
+                    await client.close()
+                    await run_sharded(create_dispatcher, bot, router.resolve_used_update_types(),
+                                      WEBHOOK_PATH, WEBHOOK_SECRET)
+                    return
+
+                dp = create_dispatcher()
+                if WEBHOOK_BASE_URL:
+                    await run_webhook(dp, bot, WEBHOOK_PATH, WEBHOOK_SECRET)
+                else:
+                    await run_polling(dp, bot)
+                # Бот остановлен штатно (сигналом), повторный запуск не нужен
+                return
             except TokenValidationError:
                 print(f"Cycle {cycle + 1}: Attempt {attempt + 1} of {CONNECTION_ATTEMPTS_COUNT} failed. Invalid token.")
                 await asyncio.sleep(delay=CONNECTION_ATTEMPTS_DELAY)
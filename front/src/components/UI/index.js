@@ -2,10 +2,12 @@ import MyInput from "@/components/UI/MyInput.vue";
 import MyButton from "@/components/UI/MyButton.vue";
 import MySelect from "@/components/UI/MySelect.vue";
 import MyCheckBox from "@/components/UI/MyCheckBox.vue";
+import MySearchSelect from "@/components/UI/MySearchSelect.vue";
 
 export default [
     MyInput,
     MyButton,
     MySelect,
     MyCheckBox,
+    MySearchSelect,
 ]
\ No newline at end of file
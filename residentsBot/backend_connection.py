@@ -1,7 +1,8 @@
 import os
 import aiohttp
+from aiohttp.payload import AsyncIterablePayload
 
-from decorators import authorization
+from botsCommon.backend_client import BackendClient, BackendError
 
 
 BASE_URL = str(os.environ.get(
@@ -9,163 +10,140 @@ BASE_URL = str(os.environ.get(
     default='http://127.0.0.1:8000'
 ))
 
+PHOTO_CHUNK_SIZE = 64 * 1024
 
-@authorization(BASE_URL)
-async def get_bot_token(token):
-    headers = {
-        'Authorization': f'Token {token}',
-    }
+client = BackendClient(
+    base_url=BASE_URL,
+    username=str(os.environ.get("RES_LOGIN_USERNAME", default='residentBot')),
+    password=str(os.environ.get("RES_LOGIN_PASSWORD", default='0ab6db854')),
+    api_token=os.environ.get("RES_API_TOKEN"),
+)
 
+
+class SizedStreamPayload(AsyncIterablePayload):
+    """
+    Файл, передаваемый в запросе по частям по мере загрузки (в памяти не больше одной части).
+    Размер файла известен заранее, поэтому запрос отправляется с Content-Length:
+    тело запроса без длины (chunked) Django не читает
+    """
+
+    def __init__(self, value, size, *args, **kwargs):
+        super().__init__(value, *args, **kwargs)
+        self._size = size
+
+    async def write(self, writer):
+        written = 0
+        async for chunk in self._value:
+            written += len(chunk)
+            if written > self._size:
+                raise aiohttp.ClientPayloadError(f'File is larger than {self._size} bytes')
+            await writer.write(chunk)
+        if written != self._size:
+            raise aiohttp.ClientPayloadError(f'File is {written} bytes instead of {self._size}')
+
+
+async def get_bot_token():
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                    url=f'{BASE_URL}/api/v1/bottokens/manage/1',
-                    headers=headers
-            ) as response:
-                return dict(await response.json())['residentBotToken']
-    except aiohttp.ClientError as e:
+        return dict(await client.get('/api/v1/bottokens/manage/1'))['residentBotToken']
+    except BackendError as e:
         print(f"Backend conection error: {e}. Source: get_bot_token")
 
 
-@authorization(BASE_URL)
-async def get_complexes_list(token):
-    headers = {
-        'Authorization': f'Token {token}',
-    }
+async def get_catalog(since_version=None):
+    params = {}
+    if since_version is not None:
+        params['since_version'] = since_version
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                    url=f'{BASE_URL}/api/v1/complex/',
-                    headers=headers
-            ) as response:
-                return list(await response.json())
-    except aiohttp.ClientError as e:
-        print(f"Backend conection error: {e}. Source: get_complexes_list")
-
-
-@authorization(BASE_URL)
-async def get_houses_list(token, complex_id):
-    headers = {
-        'Authorization': f'Token {token}',
-    }
+        return dict(await client.get('/api/v1/catalog/', params=params))
+    except BackendError as e:
+        print(f"Backend conection error: {e}. Source: get_catalog")
 
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                    url=f'{BASE_URL}/api/v1/complex/{complex_id}/houses',
-                    headers=headers
-            ) as response:
-                print(list(await response.json()))
-                return list(await response.json())
-    except aiohttp.ClientError as e:
-        print(f"Backend conection error: {e}. Source: get_houses_list")
-
-
-async def check_user_exists(token, user_id):
-    headers = {
-        'Authorization': f'Token {token}',
-    }
 
+async def check_user_exists(user_id):
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                    url=f'{BASE_URL}/api/v1/resident/by_tgid/{user_id}',
-                    headers=headers
-            ) as response:
-                resp = dict(await response.json())
-                if resp['exists']:
-                    return True, dict(resp['resident'])['pk']
-                else:
-                    return False, -1
-    except aiohttp.ClientError as e:
-        print(f"Backend conection error: {e}. Source: check_user_exists")
-
-
-async def get_or_create_resident(token, state):
-    headers = {
-        'Authorization': f'Token {token}',
-    }
+        resp = dict(await client.get(f'/api/v1/resident/by_tgid/{user_id}'))
+    except BackendError as e:
+        # Для незарегистрированного жителя бэкенд отвечает 404 с {'exists': false}
+        if e.status != 404:
+            raise
+        resp = dict(e.data)
+    if resp['exists']:
+        return True, dict(resp['resident'])['pk']
+    else:
+        return False, -1
 
+
+async def get_or_create_resident(state):
     user_data = dict(await state.get_data())
 
-    check, resident_id = await check_user_exists(token, user_data['user_tg_id'])
+    check, resident_id = await check_user_exists(user_data['user_tg_id'])
 
     if check:
         return resident_id
     else:
-        try:
-            data = {
-                'name': user_data['resident_name'],
-                'surname': user_data['resident_surname'],
-                'phone': user_data['phone_number'],
-                'tg_id': user_data['user_tg_id']
-            }
-
-            if 'resident_patronymic' in user_data and user_data['resident_patronymic'] is not '-':
-                data['patronymic'] = user_data['resident_patronymic']
-
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                        url=f'{BASE_URL}/api/v1/resident/create/',
-                        headers=headers,
-                        data=data
-                ) as response:
-                    return dict(await response.json())['pk']
-        except aiohttp.ClientError as e:
-            print(f"Backend conection error: {e}. Source: get_or_create_resident")
-
-
-@authorization(BASE_URL)
-async def create_new_request(token, state, bot):
-    headers = {
-        'Authorization': f'Token {token}'
-    }
+        data = {
+            'name': user_data['resident_name'],
+            'surname': user_data['resident_surname'],
+            'phone': user_data['phone_number'],
+            'tg_id': user_data['user_tg_id']
+        }
 
-    user_data = dict(await state.get_data())
+        if 'resident_patronymic' in user_data and user_data['resident_patronymic'] != '-':
+            data['patronymic'] = user_data['resident_patronymic']
+
+        return dict(await client.post('/api/v1/resident/create/', data=data))['pk']
 
-    form = aiohttp.FormData()
-    form.add_field('text', str(user_data['request_reason']))
-    form.add_field('status', '1')
-    form.add_field('resident', str(await get_or_create_resident(token, state)))
-    form.add_field('address', str(user_data['selected_address_id']))
 
-    if 'apartment_number' in user_data:
-        form.add_field('apartment', str(user_data['apartment_number']))
+async def create_new_request(state, bot):
+    user_data = dict(await state.get_data())
 
+    file = None
+    photo = None
     if 'request_photo' in user_data:
         file = await bot.get_file(user_data['request_photo'])
-        photo = await bot.download_file(file.file_path)
-
-        form.add_field('photo',
-                       photo,
-                       filename='request_photo.jpg',
-                       content_type='image/jpeg')
+        if file.file_size is None:
+            # Без известного размера фото нельзя передать потоком, оно загружается в память целиком
+            photo = await bot.download_file(file.file_path)
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                    url=f'{BASE_URL}/api/v1/request/create/',
-                    headers=headers,
-                    data=form
-            ) as response:
-                return await response.json()
-    except aiohttp.ClientError as e:
+        resident_id = await get_or_create_resident(state)
+
+        # Форма собирается заново для каждой попытки отправки: FormData нельзя отправить повторно
+        def build_form():
+            form = aiohttp.FormData()
+            form.add_field('text', str(user_data['request_reason']))
+            form.add_field('status', '1')
+            form.add_field('resident', str(resident_id))
+            form.add_field('address', str(user_data['selected_address_id']))
+
+            if 'apartment_number' in user_data:
+                form.add_field('apartment', str(user_data['apartment_number']))
+
+            if photo is not None:
+                photo.seek(0)
+                form.add_field('photo',
+                               photo,
+                               filename='request_photo.jpg',
+                               content_type='image/jpeg')
+            elif file is not None:
+                # Фото передаётся из Telegram в бэкенд по частям, не загружаясь в память целиком
+                stream = bot.session.stream_content(
+                    url=bot.session.api.file_url(bot.token, file.file_path),
+                    chunk_size=PHOTO_CHUNK_SIZE,
+                )
+                form.add_field('photo',
+                               SizedStreamPayload(stream, file.file_size, content_type='image/jpeg'),
+                               filename='request_photo.jpg')
+            return form
+
+        return await client.post('/api/v1/request/create/', data=build_form)
+    except BackendError as e:
         print(f"Backend conection error: {e}. Source: create_new_request")
 
 
-@authorization(BASE_URL)
-async def get_user_requests(token, user_id):
-    headers = {
-        'Authorization': f'Token {token}',
-    }
-
+async def get_user_requests(user_id):
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                    url=f'{BASE_URL}/api/v1/requests/from-user/{user_id}',
-                    headers=headers
-            ) as response:
-                return list(await response.json())
-    except aiohttp.ClientError as e:
+        return list(await client.get(f'/api/v1/requests/from-user/{user_id}'))
+    except BackendError as e:
         print(f"Backend conection error: {e}. Source: get_user_requests")
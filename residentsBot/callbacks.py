@@ -0,0 +1,21 @@
+from aiogram.filters.callback_data import CallbackData
+
+
+# Данные кнопок выбора адреса содержат только идентификаторы, названия берутся из справочника адресов
+
+
+class ComplexesPageCallback(CallbackData, prefix='cxp'):
+    page: int
+
+
+class ComplexCallback(CallbackData, prefix='cx'):
+    complex_id: int
+
+
+class HousesPageCallback(CallbackData, prefix='hsp'):
+    complex_id: int
+    page: int
+
+
+class HouseCallback(CallbackData, prefix='hs'):
+    house_id: int
@@ -0,0 +1,81 @@
+import asyncio
+import os
+
+import backend_connection as bc
+
+
+CATALOG_REFRESH_INTERVAL = float(os.environ.get(
+    "CATALOG_REFRESH_INTERVAL",
+    default='300'
+))
+
+
+class Catalog:
+    """
+    Справочник жилых комплексов и домов, хранимый в памяти бота.
+    Загружается при первом обращении и обновляется в фоне: если версия справочника на сервере
+    не изменилась, сервер отвечает без передачи самих данных
+    """
+
+    def __init__(self):
+        self.version = None
+        self.complexes = []
+        self.houses = {}
+        self.house_names = {}
+        self.lock = asyncio.Lock()
+        self.refresh_task = None
+
+    async def refresh(self):
+        async with self.lock:
+            data = await bc.get_catalog(self.version)
+            if not data or data['unchanged']:
+                return
+
+            self.complexes = [
+                {'pk': complex_el['pk'], 'name': complex_el['name']}
+                for complex_el in data['complexes']
+            ]
+            self.houses = {
+                complex_el['pk']: [{'pk': pk, 'name': name} for pk, name in complex_el['houses']]
+                for complex_el in data['complexes']
+            }
+            self.house_names = {
+                house['pk']: house['name']
+                for houses in self.houses.values()
+                for house in houses
+            }
+            self.version = data['version']
+
+    async def get_complexes(self):
+        if self.version is None:
+            await self.refresh()
+        return self.complexes
+
+    async def get_houses(self, complex_id):
+        if self.version is None:
+            await self.refresh()
+        return self.houses.get(int(complex_id), [])
+
+    async def get_house_name(self, house_id):
+        if self.version is None:
+            await self.refresh()
+        return self.house_names.get(int(house_id))
+
+    async def refresh_periodically(self):
+        while True:
+            await asyncio.sleep(CATALOG_REFRESH_INTERVAL)
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"Catalog refresh error: {e}")
+
+    async def start_refresh(self):
+        self.refresh_task = asyncio.create_task(self.refresh_periodically())
+
+    async def stop_refresh(self):
+        if self.refresh_task is not None:
+            self.refresh_task.cancel()
+            self.refresh_task = None
+
+
+catalog = Catalog()
@@ -1,4 +1,5 @@
-from aiogram import F, Router, Bot
+from aiogram import Router, Bot
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.filters import CommandStart
 from aiogram.types import Message, CallbackQuery, ContentType
 from aiogram.fsm.context import FSMContext
@@ -6,7 +7,9 @@ from aiogram.fsm.context import FSMContext
 import keyboards as kbs
 import messages as msg
 import backend_connection as bc
-from utils import is_valid_integer
+from callbacks import ComplexCallback, ComplexesPageCallback, HouseCallback, HousesPageCallback
+from catalog import catalog
+from utils import is_valid_integer, select_photo_size, shorten_name
 
 router = Router()
 
@@ -39,24 +42,53 @@ async def select_complex(callback: CallbackQuery, state: FSMContext):
     )
 
 
-@router.callback_query(F.data.startswith('complex_selected_'))
-async def complex_selected(callback: CallbackQuery, state: FSMContext):
+async def edit_page(callback: CallbackQuery, reply_markup):
+    try:
+        await callback.message.edit_reply_markup(reply_markup=reply_markup)
+    except TelegramBadRequest as e:
+        # Повторное нажатие на кнопку уже показанной страницы не меняет сообщение
+        if 'message is not modified' not in e.message:
+            raise
+
+
+@router.callback_query(ComplexesPageCallback.filter())
+async def complexes_page(callback: CallbackQuery, callback_data: ComplexesPageCallback):
+    await callback.answer()
+    await edit_page(callback, await kbs.complexes_list(callback_data.page))
+
+
+@router.callback_query(lambda query: query.data in ['current_page'])
+async def current_page(callback: CallbackQuery):
+    await callback.answer()
+
+
+@router.callback_query(ComplexCallback.filter())
+async def complex_selected(callback: CallbackQuery, callback_data: ComplexCallback, state: FSMContext):
     await state.update_data(user_state='house_selecting')
-    complex_id = callback.data.split('_')[-1]
-    await state.update_data(selected_complex_id=int(complex_id))
+    await state.update_data(selected_complex_id=callback_data.complex_id)
     await callback.message.edit_text(
         text=msg.SELECT_HOUSE_MESSAGE,
-        reply_markup=await kbs.houses_list(complex_id)
+        reply_markup=await kbs.houses_list(callback_data.complex_id)
     )
 
 
-@router.callback_query(F.data.startswith('house_selected_'))
-async def house_selected(callback: CallbackQuery, state: FSMContext):
+@router.callback_query(HousesPageCallback.filter())
+async def houses_page(callback: CallbackQuery, callback_data: HousesPageCallback):
+    await callback.answer()
+    await edit_page(callback, await kbs.houses_list(callback_data.complex_id, callback_data.page))
+
+
+@router.callback_query(HouseCallback.filter())
+async def house_selected(callback: CallbackQuery, callback_data: HouseCallback, state: FSMContext):
+    address_name = await catalog.get_house_name(callback_data.house_id)
+    if address_name is None:
+        # Дом удалён из справочника после показа списка
+        await callback.answer(text=msg.HOUSE_NOT_FOUND_MESSAGE, show_alert=True)
+        return
+
     await state.update_data(user_state='send_first_step_menu')
-    address_id = callback.data.split('_')[-2]
-    address_name = callback.data.split('_')[-1]
-    await state.update_data(selected_address_id=int(address_id))
-    await state.update_data(selected_address_name=str(address_name))
+    await state.update_data(selected_address_id=callback_data.house_id)
+    await state.update_data(selected_address_name=shorten_name(address_name))
     await callback.message.edit_text(
         text=msg.FIRST_STEP_MESSAGE,
         reply_markup=await kbs.request_first_step(state)
@@ -149,7 +181,7 @@ async def union_text_handler(message: Message, state: FSMContext):
                     if message.caption:
                         await state.update_data(request_reason=str(message.caption))
                         print(message.photo)
-                        await state.update_data(request_photo=message.photo[-1].file_id)
+                        await state.update_data(request_photo=select_photo_size(message.photo).file_id)
                         await message.answer(
                             text=msg.THIRD_STEP_MESSAGE,
                             reply_markup=await kbs.request_third_step(state)
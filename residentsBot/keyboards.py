@@ -1,8 +1,35 @@
 from aiogram.types import InlineKeyboardButton, ReplyKeyboardMarkup, KeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
-import backend_connection as bc
-from utils import shorten_name
+from callbacks import ComplexCallback, ComplexesPageCallback, HouseCallback, HousesPageCallback
+from catalog import catalog
+
+
+KEYBOARD_PAGE_SIZE = 10
+
+
+def get_page(items, page):
+    """
+    Номер страницы (в пределах списка) и элементы списка на ней
+    """
+
+    pages_count = max((len(items) + KEYBOARD_PAGE_SIZE - 1) // KEYBOARD_PAGE_SIZE, 1)
+    page = min(max(int(page), 0), pages_count - 1)
+    return page, items[page * KEYBOARD_PAGE_SIZE:(page + 1) * KEYBOARD_PAGE_SIZE]
+
+
+def add_page_buttons(keyboard, page, items_count, page_callback):
+    pages_count = (items_count + KEYBOARD_PAGE_SIZE - 1) // KEYBOARD_PAGE_SIZE
+    if pages_count <= 1:
+        return
+
+    buttons = []
+    if page > 0:
+        buttons.append(InlineKeyboardButton(text='« Назад', callback_data=page_callback(page - 1).pack()))
+    buttons.append(InlineKeyboardButton(text=f'{page + 1} / {pages_count}', callback_data='current_page'))
+    if page < pages_count - 1:
+        buttons.append(InlineKeyboardButton(text='Вперёд »', callback_data=page_callback(page + 1).pack()))
+    keyboard.row(*buttons)
 
 
 async def start_keyboard():
@@ -40,35 +67,34 @@ async def request_first_step(state):
     return keyboard.as_markup()
 
 
-async def complexes_list():
+async def complexes_list(page=0):
     keyboard = InlineKeyboardBuilder()
-    all_complexes = await bc.get_complexes_list()
+    all_complexes = await catalog.get_complexes()
+    page, complexes_page = get_page(all_complexes, page)
 
-    for complex_el in all_complexes:
+    for complex_el in complexes_page:
         keyboard.row(
-            InlineKeyboardButton(text=complex_el['name'], callback_data=f"complex_selected_{complex_el['pk']}")
+            InlineKeyboardButton(text=complex_el['name'],
+                                 callback_data=ComplexCallback(complex_id=complex_el['pk']).pack())
         )
+    add_page_buttons(keyboard, page, len(all_complexes),
+                     lambda page_number: ComplexesPageCallback(page=page_number))
     return keyboard.as_markup()
 
 
-async def houses_list(complex_id):
+async def houses_list(complex_id, page=0):
     keyboard = InlineKeyboardBuilder()
-    all_houses = await bc.get_houses_list(complex_id)
-
-    for house_el in all_houses:
-        max_l = 30
-        short_name = shorten_name(house_el['name'], max_length=max_l)
-        callback_data = f"house_selected_{house_el['pk']}_{short_name}"
-
-        while len(callback_data.encode('utf-8')) > 64:
-            max_l -= 1
-            short_name = shorten_name(house_el['name'], max_length=max_l)
-            callback_data = f"house_selected_{house_el['pk']}_{short_name}"
+    all_houses = await catalog.get_houses(complex_id)
+    page, houses_page = get_page(all_houses, page)
 
+    for house_el in houses_page:
         keyboard.row(
             InlineKeyboardButton(text=house_el['name'],
-                                 callback_data=callback_data)
+                                 callback_data=HouseCallback(house_id=house_el['pk']).pack())
         )
+    add_page_buttons(keyboard, page, len(all_houses),
+                     lambda page_number: HousesPageCallback(complex_id=int(complex_id), page=page_number))
+    keyboard.row(InlineKeyboardButton(text='К списку жилых комплексов', callback_data='select_complex'))
     return keyboard.as_markup()
 
 
@@ -13,6 +13,8 @@ SELECT_COMPLEX_MESSAGE = "Выберите свой жилой комплекс"
 
 SELECT_HOUSE_MESSAGE = "Выберите свой адрес"
 
+HOUSE_NOT_FOUND_MESSAGE = "Этот адрес больше недоступен. Выберите адрес из списка заново."
+
 INPUT_APARTMENT_MESSAGE = "Введите номер квартиры и отправьте его следующим сообщением"
 
 INCORRECT_APARTMENT_MESSAGE = "Некорректный номер квартиры, повторите попытку."
@@ -1,3 +1,14 @@
+import os
+
+
+# Ограничение размера фото заявки в байтах: из вариантов фото, которые хранит Telegram, выбирается
+# самый крупный, не превышающий ограничение. 0 - без ограничения
+REQUEST_PHOTO_MAX_SIZE = int(os.environ.get(
+    "REQUEST_PHOTO_MAX_SIZE",
+    default='0'
+))
+
+
 def is_valid_integer(s):
     try:
         number = int(s)
@@ -27,3 +38,17 @@ def shorten_name(name, max_length=30):
         shorted_street_name = street_name
 
     return f"{street_label} {shorted_street_name}., {number_label} {number_number}"
+
+
+def select_photo_size(photo_sizes, max_size=REQUEST_PHOTO_MAX_SIZE):
+    """
+    Вариант фото для заявки. Telegram передаёт варианты по возрастанию размера
+    """
+
+    if not max_size:
+        return photo_sizes[-1]
+
+    fitting_sizes = [size for size in photo_sizes if size.file_size and size.file_size <= max_size]
+    if fitting_sizes:
+        return fitting_sizes[-1]
+    return photo_sizes[0]